@@ -0,0 +1,141 @@
+import argparse
+import os
+import sys
+import typing as tp
+
+# The cipher modules are plain top-level modules, make them importable
+# when running as `python -m homework01` from the repository root.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from caesar import decrypt_caesar_bytes, encrypt_caesar_bytes  # noqa: E402
+from vigenere import decrypt_vigenere_bytes, encrypt_vigenere_bytes  # noqa: E402
+
+Transform = tp.Callable[[memoryview, int], bytes]
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+def keyword(value: str) -> str:
+    if not value or not (value.isascii() and value.isalpha()):
+        raise argparse.ArgumentTypeError(f"keyword must be non-empty latin letters, got {value!r}")
+    return value
+
+
+def caesar_transform(args: argparse.Namespace) -> Transform:
+    cipher = decrypt_caesar_bytes if args.decrypt else encrypt_caesar_bytes
+    return lambda chunk, position: cipher(chunk, args.shift)
+
+
+def vigenere_transform(args: argparse.Namespace) -> Transform:
+    cipher = decrypt_vigenere_bytes if args.decrypt else encrypt_vigenere_bytes
+    return lambda chunk, position: cipher(chunk, args.keyword, phase=position)
+
+
+def process_stream(
+    src: tp.BinaryIO,
+    dst: tp.BinaryIO,
+    transform: Transform,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    position: int = 0,
+) -> int:
+    """
+    Reads src in chunks of chunk_size bytes and writes the transformed chunks to dst.
+
+    Returns the position after the last byte, so several inputs can be chained
+    into one message without losing the key phase.
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        size = src.readinto(buffer)  # type: ignore
+        if not size:
+            break
+        dst.write(transform(view[:size], position))
+        position += size
+    return position
+
+
+def add_cipher_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-d",
+        "--decrypt",
+        action="store_true",
+        help="Decrypt the input instead of encrypting it.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help="Where to write the result (stdout by default).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of bytes read at a time.",
+    )
+    parser.add_argument(
+        "files",
+        metavar="FILE",
+        nargs="*",
+        default=["-"],
+        help="Files to process, '-' or nothing means stdin.",
+    )
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    transform = args.transform(args)
+    dst = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        position = 0
+        for filename in args.files:
+            if filename == "-":
+                position = process_stream(
+                    sys.stdin.buffer, dst, transform, args.chunk_size, position
+                )
+                continue
+            with open(filename, "rb") as src:
+                position = process_stream(src, dst, transform, args.chunk_size, position)
+    finally:
+        if dst is not sys.stdout.buffer:
+            dst.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m homework01",
+        description="Encrypt or decrypt files with classical ciphers.",
+    )
+    subparsers = parser.add_subparsers(title="ciphers", dest="cipher")
+    subparsers.required = True
+
+    caesar_parser = subparsers.add_parser("caesar", help="Caesar cipher.")
+    caesar_parser.add_argument("-s", "--shift", type=int, default=3, help="Shift to use.")
+    add_cipher_arguments(caesar_parser)
+    caesar_parser.set_defaults(transform=caesar_transform)
+
+    vigenere_parser = subparsers.add_parser(
+        "vigenere", help="Vigenere cipher, the key advances on every input byte."
+    )
+    vigenere_parser.add_argument(
+        "-k", "--keyword", type=keyword, required=True, help="Keyword to use."
+    )
+    add_cipher_arguments(vigenere_parser)
+    vigenere_parser.set_defaults(transform=vigenere_transform)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    cmd_run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Time of break_vigenere depending on the ciphertext size and the key length.
+
+    $ python benchmarks/bench_break_vigenere.py
+"""
+
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vigenere import break_vigenere, encrypt_vigenere  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+KEY_LENGTHS = [3, 8, 16]
+WORDS = (
+    "the of and to in is that it was for on are as with his they at be this from have "
+    "or by one had not but what all were when we there can an your which their said"
+).split()
+
+
+def make_plaintext(size: int) -> str:
+    rng = random.Random(size)
+    words = rng.choices(WORDS, k=size // 4)
+    return " ".join(words)[:size]
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'size':>10} {'key':>4} {'seconds':>9} {'ok':>3}")
+    for size in SIZES:
+        plaintext = make_plaintext(size)
+        for key_length in KEY_LENGTHS:
+            keyword = "".join(rng.choice(string.ascii_lowercase) for _ in range(key_length))
+            ciphertext = encrypt_vigenere(plaintext, keyword)
+            timer = timeit.Timer(lambda: break_vigenere(ciphertext))
+            number, _ = timer.autorange()
+            seconds = min(timer.repeat(repeat=3, number=number)) / number
+            found = break_vigenere(ciphertext) == keyword
+            print(f"{size:>10} {key_length:>4} {seconds:>9.4f} {'yes' if found else 'no':>3}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Throughput of the ciphers and RSA key generation speed with a regression check.
+
+Every result is an amount of work per second (bytes or keys), so the bigger the
+better. Save a baseline on a known good revision and compare later runs with it:
+
+    $ python benchmarks/bench_ciphers.py --save
+    $ python benchmarks/bench_ciphers.py --threshold 10
+
+The second command exits with status 1 if any result is more than 10% slower
+than the baseline. Key generation time depends on how far the random start is
+from a prime, so its results are much noisier than the cipher throughput.
+"""
+
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import timeit
+import typing as tp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from caesar import decrypt_caesar_bytes, encrypt_caesar_bytes  # noqa: E402
+from rsa import (  # noqa: E402
+    PrivateKey,
+    decrypt_blocks,
+    encrypt_blocks,
+    gcd,
+    generate_keypair,
+    generate_prime,
+    multiplicative_inverse,
+)
+from vigenere import decrypt_vigenere_bytes, encrypt_vigenere_bytes  # noqa: E402
+
+# name -> (function to time, amount of work it does)
+Benchmarks = tp.Dict[str, tp.Tuple[tp.Callable[[], object], int]]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+RSA_BITS = 1024
+RSA_E = 65537
+
+
+def parse_size(size: str) -> int:
+    """
+    >>> parse_size("1K"), parse_size("100M"), parse_size("64")
+    (1024, 104857600, 64)
+    """
+    size = size.strip().upper()
+    if size[-1] in UNITS:
+        return int(size[:-1]) * UNITS[size[-1]]
+    return int(size)
+
+
+def parse_list(value: str) -> tp.List[str]:
+    return [item for item in value.split(",") if item]
+
+
+def classical_benchmarks(sizes: tp.List[str]) -> Benchmarks:
+    benchmarks: Benchmarks = {}
+    for size in sizes:
+        data = os.urandom(parse_size(size))
+        benchmarks.update(
+            {
+                f"caesar-encrypt-{size}": (
+                    functools.partial(encrypt_caesar_bytes, data, 7),
+                    len(data),
+                ),
+                f"caesar-decrypt-{size}": (
+                    functools.partial(decrypt_caesar_bytes, data, 7),
+                    len(data),
+                ),
+                f"vigenere-encrypt-{size}": (
+                    functools.partial(encrypt_vigenere_bytes, data, "lemonade"),
+                    len(data),
+                ),
+                f"vigenere-decrypt-{size}": (
+                    functools.partial(decrypt_vigenere_bytes, data, "lemonade"),
+                    len(data),
+                ),
+            }
+        )
+    return benchmarks
+
+
+def rsa_primes(bits: int) -> tp.Tuple[int, int]:
+    # p == q or a common factor of RSA_E and phi would make the private exponent wrong
+    while True:
+        p, q = generate_prime(bits // 2), generate_prime(bits // 2)
+        if p != q and gcd(RSA_E, (p - 1) * (q - 1)) == 1:
+            return p, q
+
+
+def rsa_benchmarks(sizes: tp.List[str]) -> Benchmarks:
+    p, q = rsa_primes(RSA_BITS)
+    public = (RSA_E, p * q)
+    private = PrivateKey(multiplicative_inverse(RSA_E, (p - 1) * (q - 1)), p, q)
+    benchmarks: Benchmarks = {}
+    for size in sizes:
+        data = os.urandom(parse_size(size))
+        ciphertext = encrypt_blocks(public, data)
+        benchmarks.update(
+            {
+                f"rsa{RSA_BITS}-encrypt-{size}": (
+                    functools.partial(encrypt_blocks, public, data),
+                    len(data),
+                ),
+                f"rsa{RSA_BITS}-decrypt-{size}": (
+                    functools.partial(decrypt_blocks, private, ciphertext),
+                    len(data),
+                ),
+            }
+        )
+    return benchmarks
+
+
+def keygen(bits: int) -> None:
+    while True:
+        p, q = generate_prime(bits // 2), generate_prime(bits // 2)
+        if p != q:
+            generate_keypair(p, q)
+            return
+
+
+def keygen_benchmarks(key_sizes: tp.List[str]) -> Benchmarks:
+    return {f"rsa-keygen-{bits}": (functools.partial(keygen, int(bits)), 1) for bits in key_sizes}
+
+
+def measure(func: tp.Callable[[], object], repeat: int) -> float:
+    """
+    Returns the median time of one call in seconds.
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed > 1.0:
+        # Slow benchmarks are run exactly repeat times
+        number = 1
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(benchmarks: Benchmarks, repeat: int) -> tp.Dict[str, float]:
+    results = {}
+    for name, (func, amount) in benchmarks.items():
+        results[name] = amount / measure(func, repeat)
+        print(f"{name:<28} {results[name]:>16.1f}/s", file=sys.stderr)
+    return results
+
+
+def compare(
+    results: tp.Dict[str, float], baseline: tp.Dict[str, float], threshold: float
+) -> tp.List[str]:
+    """
+    Returns the names of the benchmarks that are slower than the baseline by more
+    than threshold percent.
+
+    >>> compare({"a": 80.0, "b": 95.0, "c": 1.0}, {"a": 100.0, "b": 100.0}, 10)
+    ['a']
+    """
+    return [
+        name
+        for name, value in results.items()
+        if name in baseline and value < baseline[name] * (1 - threshold / 100)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=parse_list, default="1K,1M,100M")
+    parser.add_argument("--rsa-sizes", type=parse_list, default="1K,1M")
+    parser.add_argument("--key-sizes", type=parse_list, default="512,1024,2048")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of every benchmark.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--save", action="store_true", help="Save results as the baseline.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=15.0,
+        help="Allowed slowdown against the baseline in percent.",
+    )
+    args = parser.parse_args()
+
+    benchmarks = classical_benchmarks(args.sizes)
+    benchmarks.update(rsa_benchmarks(args.rsa_sizes))
+    benchmarks.update(keygen_benchmarks(args.key_sizes))
+    results = run(benchmarks, args.repeat)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save first")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"{'benchmark':<28} {'baseline/s':>16} {'current/s':>16} {'change':>8}")
+    for name, value in results.items():
+        if name in baseline:
+            change = (value / baseline[name] - 1) * 100
+            print(f"{name:<28} {baseline[name]:>16.1f} {value:>16.1f} {change:>+7.1f}%")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Slower than the baseline by more than {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Decryption time with a plain (d, n) key and with a PrivateKey using the CRT.
+
+    $ python benchmarks/bench_rsa_crt.py
+"""
+
+import os
+import sys
+import timeit
+import typing as tp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rsa import (  # noqa: E402
+    PrivateKey,
+    decrypt_blocks,
+    encrypt_blocks,
+    gcd,
+    generate_prime,
+    multiplicative_inverse,
+)
+
+KEY_SIZES = [512, 1024, 2048]
+MESSAGE_SIZE = 16 * 1024
+E = 65537
+
+
+def key_primes(bits: int) -> tp.Tuple[int, int]:
+    # p == q or a common factor of E and phi would make the private exponent wrong
+    while True:
+        p, q = generate_prime(bits // 2), generate_prime(bits // 2)
+        if p != q and gcd(E, (p - 1) * (q - 1)) == 1:
+            return p, q
+
+
+def main() -> None:
+    message = os.urandom(MESSAGE_SIZE)
+    print(f"{'bits':>5} {'plain, s':>9} {'crt, s':>9} {'speedup':>8}")
+    for bits in KEY_SIZES:
+        p, q = key_primes(bits)
+        d = multiplicative_inverse(E, (p - 1) * (q - 1))
+        crt_key = PrivateKey(d, p, q)
+        plain_key = (d, p * q)
+        ciphertext = encrypt_blocks((E, p * q), message)
+        assert decrypt_blocks(crt_key, ciphertext) == message
+
+        plain = min(
+            timeit.repeat(lambda: decrypt_blocks(plain_key, ciphertext), number=1, repeat=3)
+        )
+        crt = min(timeit.repeat(lambda: decrypt_blocks(crt_key, ciphertext), number=1, repeat=3))
+        print(f"{bits:>5} {plain:>9.3f} {crt:>9.3f} {plain / crt:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
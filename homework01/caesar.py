@@ -1,5 +1,38 @@
+import functools
+import string
 import typing as tp
 
+Buffer = tp.Union[bytes, bytearray, memoryview]
+
+
+def _shifted_alphabet(shift: int) -> tp.Tuple[str, str]:
+    lower, upper = string.ascii_lowercase, string.ascii_uppercase
+    shift %= 26
+    return lower + upper, lower[shift:] + lower[:shift] + upper[shift:] + upper[:shift]
+
+
+@functools.lru_cache(maxsize=None)
+def caesar_table(shift: int) -> tp.Dict[int, int]:
+    """
+    Translation table for str.translate shifting latin letters by shift.
+
+    >>> "Python3.6".translate(caesar_table(3))
+    'Sbwkrq3.6'
+    """
+    return str.maketrans(*_shifted_alphabet(shift))
+
+
+@functools.lru_cache(maxsize=None)
+def caesar_byte_table(shift: int) -> bytes:
+    """
+    256-byte translation table for bytes.translate shifting ASCII letters by shift.
+
+    >>> b"Python3.6".translate(caesar_byte_table(3))
+    b'Sbwkrq3.6'
+    """
+    source, target = _shifted_alphabet(shift)
+    return bytes.maketrans(source.encode(), target.encode())
+
 
 def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
     """
@@ -14,15 +47,7 @@ def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
     >>> encrypt_caesar("")
     ''
     """
-    ciphertext = ""
-    for letter in plaintext:
-        symbol_number = ord(letter)
-        if letter.isupper():
-            symbol_number = (symbol_number + shift - ord("A")) % 26 + ord("A")
-        elif letter.islower():
-            symbol_number = (symbol_number + shift - ord("a")) % 26 + ord("a")
-        ciphertext += chr(symbol_number)
-    return ciphertext
+    return plaintext.translate(caesar_table(shift % 26))
 
 
 def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
@@ -38,21 +63,113 @@ def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
     >>> decrypt_caesar("")
     ''
     """
-    plaintext = ""
-    for letter in ciphertext:
-        symbol_number = ord(letter)
-        if letter.isupper():
-            symbol_number = (symbol_number - shift - ord("A")) % 26 + ord("A")
-        elif letter.islower():
-            symbol_number = (symbol_number - shift - ord("a")) % 26 + ord("a")
-        plaintext += chr(symbol_number)
-    return plaintext
+    return ciphertext.translate(caesar_table(-shift % 26))
+
+
+def encrypt_caesar_bytes(data: Buffer, shift: int = 3) -> bytes:
+    """
+    Encrypts a bytes-like object using a Caesar cipher.
+
+    Only ASCII letters are shifted, so UTF-8 encoded text can be passed as is.
+
+    >>> encrypt_caesar_bytes(b"Python3.6")
+    b'Sbwkrq3.6'
+    >>> encrypt_caesar_bytes(memoryview(b"PYTHON"))
+    b'SBWKRQ'
+    """
+    return bytes(data).translate(caesar_byte_table(shift % 26))
+
+
+def decrypt_caesar_bytes(data: Buffer, shift: int = 3) -> bytes:
+    """
+    Decrypts a bytes-like object using a Caesar cipher.
+
+    >>> decrypt_caesar_bytes(b"Sbwkrq3.6")
+    b'Python3.6'
+    """
+    return bytes(data).translate(caesar_byte_table(-shift % 26))
+
+
+# Relative frequencies of the letters a..z in English text.
+# fmt: off
+ENGLISH_LETTER_FREQUENCIES = (
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+)
+# fmt: on
+
+# How many leading characters of the ciphertext are decrypted to count dictionary hits.
+DICTIONARY_SAMPLE_SIZE = 4096
+
+
+def letter_counts(text: str) -> tp.List[int]:
+    """
+    Returns the number of occurrences of every latin letter a..z, case insensitive.
+
+    >>> letter_counts("Abba!")[:3]
+    [2, 2, 0]
+    """
+    text = text.lower()
+    return [text.count(letter) for letter in string.ascii_lowercase]
+
+
+def chi_squared_scores(counts: tp.Sequence[int]) -> tp.List[float]:
+    """
+    Returns the chi-squared statistic against English letter frequencies for every
+    shift 0..25, assuming counts were taken from a text encrypted with that shift.
+    The lower the score, the more the decrypted text looks like English.
+    """
+    total = sum(counts)
+    if total == 0:
+        return [0.0] * 26
+    scores = []
+    for shift in range(26):
+        score = 0.0
+        for i, frequency in enumerate(ENGLISH_LETTER_FREQUENCIES):
+            expected = total * frequency
+            score += (counts[(i + shift) % 26] - expected) ** 2 / expected
+        scores.append(score)
+    return scores
+
+
+def rank_caesar_shifts(
+    ciphertext: str, dictionary: tp.Set[str]
+) -> tp.List[tp.Tuple[int, float, float]]:
+    """
+    Scores every shift and returns (shift, dictionary hit ratio, chi-squared) tuples,
+    best candidates first.
+
+    The letter histogram is computed once for the whole ciphertext, and only its
+    first DICTIONARY_SAMPLE_SIZE characters are decrypted to look words up.
+
+    >>> rank_caesar_shifts(encrypt_caesar("python is fun", 5), {"python", "is"})[0][:2]
+    (5, 0.6666666666666666)
+    """
+    chi_squared = chi_squared_scores(letter_counts(ciphertext))
+    sample = ciphertext[:DICTIONARY_SAMPLE_SIZE].split()
+    if len(ciphertext) > DICTIONARY_SAMPLE_SIZE:
+        # The last word may be cut in half
+        sample = sample[:-1]
+    sample_text = " ".join(word.strip(string.punctuation) for word in sample)
+
+    candidates = []
+    for shift in range(26):
+        hits = 0.0
+        words = decrypt_caesar(sample_text, shift).split()
+        if words and dictionary:
+            found = sum(word in dictionary or word.lower() in dictionary for word in words)
+            hits = found / len(words)
+        candidates.append((shift, hits, chi_squared[shift]))
+    candidates.sort(key=lambda candidate: (-candidate[1], candidate[2]))
+    return candidates
 
 
 def caesar_breaker_brute_force(ciphertext: str, dictionary: tp.Set[str]) -> int:
     """
     Brute force breaking a Caesar cipher.
+
+    >>> caesar_breaker_brute_force(encrypt_caesar("python", 10), {"python", "java", "ruby"})
+    10
     """
-    best_shift = 0
-    # PUT YOUR CODE HERE
-    return best_shift
+    return rank_caesar_shifts(ciphertext, dictionary)[0][0]
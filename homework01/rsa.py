@@ -1,20 +1,134 @@
+import concurrent.futures
+import functools
+import itertools
+import os
 import random
+import secrets
 import typing as tp
 
+# Primes up to this bound are found with a sieve and used for trial division.
+SMALL_PRIMES_LIMIT = 2000
+
+# Miller-Rabin with these bases is deterministic for every n < 3.3 * 10**24,
+# which covers all 64-bit numbers.
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+DETERMINISTIC_LIMIT = 3_317_044_064_679_887_385_961_981
+
+# Random bases for larger numbers, the error probability is below 4**-rounds.
+MILLER_RABIN_ROUNDS = 20
+
+# generate_prime sieves windows of this many odd candidates by primes below the limit.
+CANDIDATES_SIEVE_LIMIT = 1 << 16
+CANDIDATES_WINDOW = 1 << 12
+
+_random = random.SystemRandom()
+
+
+@functools.lru_cache(maxsize=None)
+def small_primes(limit: int = SMALL_PRIMES_LIMIT) -> tp.Tuple[int, ...]:
+    """
+    Sieve of Eratosthenes, returns all primes below limit.
+
+    >>> small_primes(20)
+    (2, 3, 5, 7, 11, 13, 17, 19)
+    """
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i :: i] = bytes(len(range(i * i, limit, i)))
+    return tuple(i for i, is_set in enumerate(sieve) if is_set)
+
+
+@functools.lru_cache(maxsize=None)
+def _small_primes_set(limit: int = SMALL_PRIMES_LIMIT) -> tp.FrozenSet[int]:
+    return frozenset(small_primes(limit))
+
+
+def _is_strong_probable_prime(n: int, base: int, d: int, s: int) -> bool:
+    # n - 1 == d * 2**s with odd d
+    x = pow(base, d, n)
+    if x in (1, n - 1):
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
 
 def is_prime(n: int) -> bool:
-    if n == 1:
-        return False;
-    for i in range(2, n):
-        if n % i == 0:
+    """
+    Tests n for primality with trial division by small primes followed by
+    the Miller-Rabin test, deterministic for 64-bit numbers.
+
+    >>> is_prime(2)
+    True
+    >>> is_prime(11)
+    True
+    >>> is_prime(8)
+    False
+    >>> is_prime(2 ** 127 - 1)
+    True
+    """
+    if n < SMALL_PRIMES_LIMIT:
+        return n in _small_primes_set()
+    for prime in small_primes():
+        if n % prime == 0:
             return False
-    return True
+    if n < SMALL_PRIMES_LIMIT ** 2:
+        return True
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    bases: tp.Iterable[int] = DETERMINISTIC_BASES
+    if n >= DETERMINISTIC_LIMIT:
+        # Base 2 first: almost every composite fails on it
+        random_bases = (_random.randrange(3, n - 1) for _ in range(MILLER_RABIN_ROUNDS))
+        bases = itertools.chain((2,), random_bases)
+    return all(_is_strong_probable_prime(n, base, d, s) for base in bases)
+
+
+def generate_prime(bits: int) -> int:
+    """
+    Returns a random prime number exactly bits long.
+
+    The two highest bits are set, so the product of two such primes is 2 * bits long.
+    Odd numbers following a random start are sieved by the primes below
+    CANDIDATES_SIEVE_LIMIT, only the survivors go through the Miller-Rabin test.
+
+    >>> generate_prime(64).bit_length()
+    64
+    """
+    if bits < 2:
+        raise ValueError("A prime number has at least 2 bits.")
+    if bits <= 16:
+        # The two highest bits are set as below, there is such a prime even for 2 bits: 3
+        return _random.choice([p for p in small_primes(1 << bits) if p >> (bits - 2) == 0b11])
+    top = 0b11 << (bits - 2)
+    primes = small_primes(CANDIDATES_SIEVE_LIMIT)[1:]
+    while True:
+        start = secrets.randbits(bits) | top | 1
+        # sieve[i] stands for start + 2 * i
+        sieve = bytearray([1]) * CANDIDATES_WINDOW
+        for prime in primes:
+            first = -(start % prime) * (prime + 1) // 2 % prime
+            sieve[first::prime] = bytes(len(range(first, CANDIDATES_WINDOW, prime)))
+        for i in itertools.compress(range(CANDIDATES_WINDOW), sieve):
+            candidate = start + 2 * i
+            if candidate.bit_length() > bits:
+                break
+            if is_prime(candidate):
+                return candidate
+
 
 def gcd(a: int, b: int) -> int:
     while b != 0:
         a, b = b, a % b
     return a
 
+
 def multiplicative_inverse(e: int, phi: int) -> int:
     """
     Euclid's extended algorithm for finding the multiplicative
@@ -27,16 +141,59 @@ def multiplicative_inverse(e: int, phi: int) -> int:
     while phi:
         q = e // phi
         e, phi = phi, e % phi
-        x1, x2, y1, y2 = x2, x1 - x2*q, y2, y1 - y2*q
+        x1, x2, y1, y2 = x2, x1 - x2 * q, y2, y1 - y2 * q
     return x1 % save
 
-def generate_keypair(p: int, q: int) -> tp.Tuple[tp.Tuple[int, int], tp.Tuple[int, int]]:
+
+class PrivateKey(tp.Tuple[int, int]):
+    """
+    Private key (d, n) that also keeps the factors of n and the Chinese Remainder
+    Theorem parameters, so it can be used anywhere a (d, n) tuple is expected.
+
+    >>> key = PrivateKey(151, 17, 19)
+    >>> key == (151, 323), (key.dp, key.dq, key.qinv)
+    (True, (7, 7, 9))
+    """
+
+    p: int
+    q: int
+    dp: int
+    dq: int
+    qinv: int
+
+    def __new__(cls, d: int, p: int, q: int) -> "PrivateKey":
+        key = super().__new__(cls, (d, p * q))  # type: ignore
+        key.p, key.q = p, q
+        key.dp, key.dq = d % (p - 1), d % (q - 1)
+        key.qinv = multiplicative_inverse(q, p)
+        return key
+
+    def __getnewargs__(self) -> tp.Tuple[int, int, int]:  # type: ignore
+        return self[0], self.p, self.q
+
+
+def apply_key(pk: tp.Tuple[int, int], number: int) -> int:
+    """
+    Computes number ** key % n, using the CRT when pk is a PrivateKey.
+
+    >>> apply_key((151, 323), 100), apply_key(PrivateKey(151, 17, 19), 100)
+    (263, 263)
+    """
+    if isinstance(pk, PrivateKey):
+        m1 = pow(number, pk.dp, pk.p)
+        m2 = pow(number, pk.dq, pk.q)
+        return m2 + pk.qinv * (m1 - m2) % pk.p * pk.q
+    key, n = pk
+    return pow(number, key, n)
+
+
+def generate_keypair(p: int, q: int) -> tp.Tuple[tp.Tuple[int, int], PrivateKey]:
     if not (is_prime(p) and is_prime(q)):
         raise ValueError("Both numbers must be prime.")
     elif p == q:
         raise ValueError("p and q cannot be equal")
     n = p * q
-    phi = (p-1)*(q-1)
+    phi = (p - 1) * (q - 1)
     # Choose an integer e such that e and phi(n) are coprime
     e = random.randrange(1, phi)
 
@@ -50,29 +207,127 @@ def generate_keypair(p: int, q: int) -> tp.Tuple[tp.Tuple[int, int], tp.Tuple[in
     d = multiplicative_inverse(e, phi)
 
     # Return public and private keypair
-    # Public key is (e, n) and private key is (d, n)
-    return (e, n), (d, n)
+    # Public key is (e, n) and private key is (d, n) with the CRT parameters
+    return (e, n), PrivateKey(d, p, q)
 
 
 def encrypt(pk: tp.Tuple[int, int], plaintext: str) -> tp.List[int]:
-    # Unpack the key into it's components
-    key, n = pk
     # Convert each letter in the plaintext to numbers based on
     # the character using a^b mod m
-    cipher = [(ord(char) ** key) % n for char in plaintext]
+    cipher = [apply_key(pk, ord(char)) for char in plaintext]
     # Return the array of bytes
     return cipher
 
 
 def decrypt(pk: tp.Tuple[int, int], ciphertext: tp.List[int]) -> str:
-    # Unpack the key into its components
-    key, n = pk
     # Generate the plaintext based on the ciphertext and key using a^b mod m
-    plain = [chr((char ** key) % n) for char in ciphertext]
+    plain = [chr(apply_key(pk, char)) for char in ciphertext]
     # Return the array of bytes as a string
     return "".join(plain)
 
 
+def block_sizes(n: int) -> tp.Tuple[int, int]:
+    """
+    Returns the sizes in bytes of a plaintext and a ciphertext block for the modulus n.
+
+    A plaintext block is always smaller than n, a ciphertext block fits any number below n.
+
+    >>> block_sizes(1697249)
+    (2, 3)
+    """
+    plain_size = (n.bit_length() - 1) // 8
+    if plain_size < 1:
+        raise ValueError("The modulus is too small for block encryption.")
+    return plain_size, (n.bit_length() + 7) // 8
+
+
+def encrypt_blocks(pk: tp.Tuple[int, int], plaintext: bytes) -> bytes:
+    """
+    Encrypts bytes packing as many of them into every number as the modulus allows.
+
+    The message is padded with 0x80 followed by zero bytes up to the block size.
+
+    >>> encrypt_blocks((194389, 1697249), b"RSA!").hex()
+    '14aae61473500b1ad9'
+    """
+    plain_size, cipher_size = block_sizes(pk[1])
+    data = bytes(plaintext) + b"\x80"
+    data += bytes(-len(data) % plain_size)
+    view = memoryview(data)
+    return b"".join(
+        apply_key(pk, int.from_bytes(view[i : i + plain_size], "big")).to_bytes(cipher_size, "big")
+        for i in range(0, len(data), plain_size)
+    )
+
+
+def decrypt_blocks(pk: tp.Tuple[int, int], ciphertext: bytes) -> bytes:
+    """
+    Decrypts bytes encrypted with encrypt_blocks.
+
+    Raises ValueError if a block does not decrypt to a valid padded message,
+    which usually means a wrong key or corrupted ciphertext.
+
+    >>> decrypt_blocks((324589, 1697249), bytes.fromhex("14aae61473500b1ad9"))
+    b'RSA!'
+    """
+    plain_size, cipher_size = block_sizes(pk[1])
+    if len(ciphertext) % cipher_size:
+        raise ValueError("The ciphertext length is not a multiple of the block size.")
+    view = memoryview(ciphertext)
+    blocks = []
+    for i in range(0, len(ciphertext), cipher_size):
+        value = apply_key(pk, int.from_bytes(view[i : i + cipher_size], "big"))
+        if value >> (8 * plain_size):
+            raise ValueError("Block out of range, wrong key or corrupted ciphertext.")
+        blocks.append(value.to_bytes(plain_size, "big"))
+    data = b"".join(blocks).rstrip(b"\x00")
+    if not data.endswith(b"\x80"):
+        raise ValueError("Invalid padding, wrong key or corrupted ciphertext.")
+    return data[:-1]
+
+
+def _map_blocks(
+    func: tp.Callable[[tp.Tuple[int, int], bytes], bytes],
+    pk: tp.Tuple[int, int],
+    messages: tp.Sequence[bytes],
+    workers: tp.Optional[int],
+    chunksize: tp.Optional[int],
+) -> tp.List[bytes]:
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # A few chunks per worker balance the load and keep the IPC overhead low
+        chunksize = max(1, len(messages) // (workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(functools.partial(func, pk), messages, chunksize=chunksize))
+
+
+def encrypt_many(
+    pk: tp.Tuple[int, int],
+    messages: tp.Sequence[bytes],
+    workers: tp.Optional[int] = None,
+    chunksize: tp.Optional[int] = None,
+) -> tp.List[bytes]:
+    """
+    Encrypts every message with encrypt_blocks in a pool of worker processes.
+
+    Messages are sent to the workers in chunks of chunksize, the results are
+    returned in the order of the messages.
+    """
+    return _map_blocks(encrypt_blocks, pk, messages, workers, chunksize)
+
+
+def decrypt_many(
+    pk: tp.Tuple[int, int],
+    ciphertexts: tp.Sequence[bytes],
+    workers: tp.Optional[int] = None,
+    chunksize: tp.Optional[int] = None,
+) -> tp.List[bytes]:
+    """
+    Decrypts every ciphertext with decrypt_blocks in a pool of worker processes.
+    """
+    return _map_blocks(decrypt_blocks, pk, ciphertexts, workers, chunksize)
+
+
 if __name__ == "__main__":
     print("RSA Encrypter/ Decrypter")
     p = int(input("Enter a prime number (17, 19, 23, etc): "))
@@ -51,3 +51,21 @@ class CaesarTestCase(unittest.TestCase):
             caesar.decrypt_caesar(ciphertext, shift=shift),
             msg=f"shift={shift}, ciphertext={ciphertext}",
         )
+
+    def test_bytes_matches_str(self):
+        shift = 11
+        plaintext = string.printable * 4
+        ciphertext = caesar.encrypt_caesar_bytes(memoryview(plaintext.encode()), shift=shift)
+        self.assertEqual(caesar.encrypt_caesar(plaintext, shift=shift).encode(), ciphertext)
+        self.assertEqual(plaintext.encode(), caesar.decrypt_caesar_bytes(ciphertext, shift=shift))
+
+    def test_caesar_breaker(self):
+        dictionary = {"python", "java", "ruby", "haskell", "go"}
+        for shift in (0, 5, 17):
+            with self.subTest(shift=shift):
+                ciphertext = caesar.encrypt_caesar("python", shift=shift)
+                self.assertEqual(shift, caesar.caesar_breaker_brute_force(ciphertext, dictionary))
+
+        plaintext = "the quick brown fox jumps over the lazy dog and keeps running " * 100
+        ciphertext = caesar.encrypt_caesar(plaintext, shift=19)
+        self.assertEqual(19, caesar.caesar_breaker_brute_force(ciphertext, set()))
@@ -0,0 +1,66 @@
+import contextlib
+import importlib.util
+import io
+import os
+import pathlib
+import tempfile
+import unittest
+
+import caesar
+import vigenere
+
+# __main__.py cannot be imported by name, so it is loaded from its path
+_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "__main__.py")
+_spec = importlib.util.spec_from_file_location("homework01_cli", _path)
+assert _spec is not None and _spec.loader is not None
+cli = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cli)
+
+
+class CliTestCase(unittest.TestCase):
+    def parse(self, argv):
+        return cli.build_parser().parse_args(argv)
+
+    def test_process_stream_keeps_key_phase_across_chunks_and_files(self):
+        parts = [b"ATTACK AT DAWN, ", b"", b"retreat at dusk!", b"x" * 50]
+        args = self.parse(["vigenere", "-k", "lemon"])
+        transform = args.transform(args)
+        dst = io.BytesIO()
+        position = 0
+        for part in parts:
+            position = cli.process_stream(io.BytesIO(part), dst, transform, 3, position)
+        message = b"".join(parts)
+        self.assertEqual(len(message), position)
+        self.assertEqual(vigenere.encrypt_vigenere_bytes(message, "lemon"), dst.getvalue())
+
+    def test_run_encrypts_and_decrypts_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = pathlib.Path(tmp) / "a.txt", pathlib.Path(tmp) / "b.txt"
+            encrypted, decrypted = pathlib.Path(tmp) / "enc", pathlib.Path(tmp) / "dec"
+            first.write_bytes(b"Hello, World! " * 100)
+            second.write_bytes(b"python\n" * 37)
+            cli.cmd_run(
+                self.parse(
+                    ["caesar", "-s", "5", "--chunk-size", "7", "-o", str(encrypted)]
+                    + [str(first), str(second)]
+                )
+            )
+            message = first.read_bytes() + second.read_bytes()
+            self.assertEqual(caesar.encrypt_caesar_bytes(message, 5), encrypted.read_bytes())
+            cli.cmd_run(
+                self.parse(["caesar", "-d", "-s", "5", "-o", str(decrypted), str(encrypted)])
+            )
+            self.assertEqual(message, decrypted.read_bytes())
+
+    def test_invalid_arguments(self):
+        cases = [
+            ["caesar", "--chunk-size", "0"],
+            ["caesar", "--chunk-size", "-5"],
+            ["vigenere", "-k", ""],
+            ["vigenere", "-k", "lemon1"],
+        ]
+        for argv in cases:
+            with self.subTest(argv=argv):
+                with contextlib.redirect_stderr(io.StringIO()):
+                    with self.assertRaises(SystemExit):
+                        self.parse(argv)
@@ -17,6 +17,22 @@ class RSATestCase(unittest.TestCase):
         self.assertTrue(rsa.is_prime(7))
         self.assertFalse(rsa.is_prime(8))
         self.assertTrue(rsa.is_prime(3571))
+        self.assertFalse(rsa.is_prime(561))
+        self.assertFalse(rsa.is_prime(3215031751))
+        self.assertTrue(rsa.is_prime(2305843009213693951))
+        self.assertFalse(rsa.is_prime(2305843009213693951 * 2147483647))
+        self.assertTrue(rsa.is_prime(2 ** 521 - 1))
+        self.assertFalse(rsa.is_prime(2 ** 523 - 1))
+
+    def test_generate_prime(self):
+        for bits in (2, 3, 8, 16, 17, 64, 256):
+            with self.subTest(bits=bits):
+                prime = rsa.generate_prime(bits)
+                self.assertEqual(bits, prime.bit_length())
+                self.assertEqual(0b11, prime >> (bits - 2))
+                self.assertTrue(rsa.is_prime(prime))
+        for _ in range(20):
+            self.assertEqual(16, (rsa.generate_prime(8) * rsa.generate_prime(8)).bit_length())
 
     def test_gcd(self):
         self.assertEqual(0, rsa.gcd(0, 0))
@@ -40,3 +56,46 @@ class RSATestCase(unittest.TestCase):
         self.assertEqual(
             ((8799823, 11188147), (5490847, 11188147)), rsa.generate_keypair(3259, 3433)
         )
+
+    def test_encrypt_decrypt_blocks(self):
+        p, q = 2 ** 61 - 1, 2 ** 89 - 1
+        e = 65537
+        d = rsa.multiplicative_inverse(e, (p - 1) * (q - 1))
+        public, private = (e, p * q), (d, p * q)
+        for plaintext in (b"", b"\x00", b"RSA", b"\x80\x00\x00", bytes(range(256)) * 3):
+            with self.subTest(plaintext=plaintext):
+                ciphertext = rsa.encrypt_blocks(public, plaintext)
+                self.assertEqual(0, len(ciphertext) % 19)
+                self.assertEqual(plaintext, rsa.decrypt_blocks(private, ciphertext))
+
+        ciphertext = rsa.encrypt_blocks(public, bytes(range(256)))
+        for wrong in ((d + 2, p * q), rsa.PrivateKey(d + 2, p, q)):
+            with self.subTest(wrong=wrong):
+                with self.assertRaises(ValueError):
+                    rsa.decrypt_blocks(wrong, ciphertext)
+
+        ciphertext = rsa.encrypt_blocks((194389, 1697249), b"Hi!")
+        self.assertEqual(b"Hi!", rsa.decrypt_blocks((324589, 1697249), ciphertext))
+        with self.assertRaises(ValueError):
+            rsa.encrypt_blocks((103, 187), b"too small")
+
+    def test_private_key_crt(self):
+        p, q = 2 ** 61 - 1, 2 ** 89 - 1
+        e = 65537
+        d = rsa.multiplicative_inverse(e, (p - 1) * (q - 1))
+        private = rsa.PrivateKey(d, p, q)
+        self.assertEqual((d, p * q), private)
+        for message in (0, 1, 2, 12345678901234567890, p * q - 1):
+            with self.subTest(message=message):
+                ciphertext = pow(message, e, p * q)
+                self.assertEqual(message, rsa.apply_key(private, ciphertext))
+
+    def test_encrypt_decrypt_many(self):
+        p, q = 2 ** 61 - 1, 2 ** 89 - 1
+        e = 65537
+        d = rsa.multiplicative_inverse(e, (p - 1) * (q - 1))
+        public, private = (e, p * q), rsa.PrivateKey(d, p, q)
+        messages = [f"message #{i}".encode() * i for i in range(50)]
+        ciphertexts = rsa.encrypt_many(public, messages, workers=2)
+        self.assertEqual([rsa.encrypt_blocks(public, m) for m in messages], ciphertexts)
+        self.assertEqual(messages, rsa.decrypt_many(private, ciphertexts, workers=2, chunksize=7))
@@ -40,3 +40,35 @@ class VigenereTestCase(unittest.TestCase):
         plaintext = ''.join(random.choice(string.ascii_letters + ' -,') for _ in range(64))
         ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
         self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, keyword))
+
+    def test_non_ascii_text(self):
+        # Cyrillic is left as is, but the key still advances on it, as on punctuation
+        plaintext = "Привет, ATTACKATDAWN!"
+        ciphertext = vigenere.encrypt_vigenere(plaintext, "LEMON")
+        expected = vigenere.encrypt_vigenere("______, ATTACKATDAWN!", "LEMON")
+        self.assertEqual("Привет" + expected[6:], ciphertext)
+        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, "LEMON"))
+
+    def test_bytes_in_chunks(self):
+        keyword = "Keyword"
+        plaintext = string.printable
+        expected = vigenere.encrypt_vigenere(plaintext, keyword).encode()
+        data = plaintext.encode()
+        ciphertext = b"".join(
+            vigenere.encrypt_vigenere_bytes(data[i : i + 16], keyword, phase=i)
+            for i in range(0, len(data), 16)
+        )
+        self.assertEqual(expected, ciphertext)
+        self.assertEqual(data, vigenere.decrypt_vigenere_bytes(ciphertext, keyword))
+
+    def test_break_vigenere(self):
+        plaintext = (
+            "it is a truth universally acknowledged, that a single man in possession "
+            "of a good fortune, must be in want of a wife. however little known the "
+            "feelings or views of such a man may be on his first entering a neighbourhood, "
+            "this truth is so well fixed in the minds of the surrounding families"
+        ) * 3
+        for keyword in ("key", "Lemon", "encyclopedia"):
+            with self.subTest(keyword=keyword):
+                ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
+                self.assertEqual(keyword.lower(), vigenere.break_vigenere(ciphertext))
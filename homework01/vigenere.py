@@ -1,3 +1,43 @@
+import typing as tp
+
+import numpy as np
+
+from caesar import Buffer, caesar_byte_table, caesar_table, chi_squared_scores
+
+
+def keyword_shifts(keyword: str) -> tp.List[int]:
+    """
+    Returns the shift for every letter of the keyword.
+
+    >>> keyword_shifts("LEMON")
+    [11, 4, 12, 14, 13]
+    """
+    return [(ord(letter.lower()) - ord("a")) % 26 for letter in keyword]
+
+
+def _translate_text(text: str, shifts: tp.Sequence[int]) -> str:
+    # Every k-th character is shifted by the same amount, so the text is processed
+    # as len(shifts) strided slices, each with a single str.translate call.
+    # ASCII text is shifted as bytes: one byte per character instead of a list
+    # with a pointer per character, which is only kept for other texts.
+    if text.isascii():
+        return _translate_bytes(text.encode("ascii"), shifts, 0).decode("ascii")
+    chars = list(text)
+    k = len(shifts)
+    for i, shift in enumerate(shifts):
+        chars[i::k] = text[i::k].translate(caesar_table(shift))
+    return "".join(chars)
+
+
+def _translate_bytes(data: Buffer, shifts: tp.Sequence[int], phase: int) -> bytes:
+    buffer = bytearray(data)
+    k = len(shifts)
+    for i in range(k):
+        shift = shifts[(phase + i) % k]
+        buffer[i::k] = buffer[i::k].translate(caesar_byte_table(shift))
+    return bytes(buffer)
+
+
 def encrypt_vigenere(plaintext: str, keyword: str) -> str:
     """
     Encrypts plaintext using a Vigenere cipher.
@@ -9,18 +49,7 @@ def encrypt_vigenere(plaintext: str, keyword: str) -> str:
     >>> encrypt_vigenere("ATTACKATDAWN", "LEMON")
     'LXFOPVEFRNHR'
     """
-    ciphertext = ""
-    keyword *= len(plaintext) // len(keyword) + 1
-    for letter in plaintext:
-        symbol_number = ord(letter)
-        shift = ord(keyword[0].lower())-ord("a")
-        keyword = keyword[1:]
-        if letter.isupper():
-            symbol_number = (symbol_number + shift - ord("A")) % 26 + ord("A")
-        elif letter.islower():
-            symbol_number = (symbol_number + shift - ord("a")) % 26 + ord("a")
-        ciphertext += chr(symbol_number)
-    return ciphertext
+    return _translate_text(plaintext, keyword_shifts(keyword))
 
 
 def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
@@ -34,15 +63,95 @@ def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
     >>> decrypt_vigenere("LXFOPVEFRNHR", "LEMON")
     'ATTACKATDAWN'
     """
-    plaintext = ""
-    keyword *= len(ciphertext) // len(keyword) + 1
-    for letter in ciphertext:
-        symbol_number=ord(letter)
-        shift=ord(keyword[0].lower())-ord("a")
-        keyword=keyword[1:]
-        if letter.isupper():
-            symbol_number=(symbol_number - shift - ord("A")) % 26 + ord("A")
-        elif letter.islower():
-            symbol_number=(symbol_number - shift - ord("a")) % 26 + ord("a")
-        plaintext += chr(symbol_number)
-    return plaintext
+    return _translate_text(ciphertext, [-shift % 26 for shift in keyword_shifts(keyword)])
+
+
+def encrypt_vigenere_bytes(data: Buffer, keyword: str, phase: int = 0) -> bytes:
+    """
+    Encrypts a bytes-like object using a Vigenere cipher.
+
+    The key advances on every byte; phase is the position of the first byte
+    in the whole message, which lets a long message be encrypted in chunks.
+
+    >>> encrypt_vigenere_bytes(b"ATTACKATDAWN", "LEMON")
+    b'LXFOPVEFRNHR'
+    >>> encrypt_vigenere_bytes(b"ATDAWN", "LEMON", phase=6)
+    b'EFRNHR'
+    """
+    return _translate_bytes(data, keyword_shifts(keyword), phase)
+
+
+def decrypt_vigenere_bytes(data: Buffer, keyword: str, phase: int = 0) -> bytes:
+    """
+    Decrypts a bytes-like object using a Vigenere cipher.
+
+    >>> decrypt_vigenere_bytes(b"LXFOPVEFRNHR", "LEMON")
+    b'ATTACKATDAWN'
+    """
+    return _translate_bytes(data, [-shift % 26 for shift in keyword_shifts(keyword)], phase)
+
+
+def _letter_codes(text: str) -> tp.Tuple[np.ndarray, np.ndarray]:
+    # Returns positions of the latin letters in text and their codes 0..25.
+    # The key advances on every character, so positions are kept for non-letters too.
+    chars = np.frombuffer(text.lower().encode("utf-32-le"), dtype=np.uint32)
+    positions = np.flatnonzero((chars >= ord("a")) & (chars <= ord("z")))
+    return positions, (chars[positions] - ord("a")).astype(np.intp)
+
+
+def _column_counts(positions: np.ndarray, codes: np.ndarray, key_length: int) -> np.ndarray:
+    # Letter histogram of every key column as a (key_length, 26) matrix.
+    bins = (positions % key_length) * 26 + codes
+    return np.bincount(bins, minlength=key_length * 26).reshape(key_length, 26)
+
+
+def index_of_coincidence(counts: np.ndarray) -> float:
+    """
+    Returns the mean index of coincidence of the rows of a letter histogram matrix.
+    """
+    totals = counts.sum(axis=1)
+    valid = totals > 1
+    if not valid.any():
+        return 0.0
+    pairs = (counts[valid] * (counts[valid] - 1)).sum(axis=1)
+    return float((pairs / (totals[valid] * (totals[valid] - 1))).mean())
+
+
+def estimate_key_length(ciphertext: str, max_key_length: int = 20) -> int:
+    """
+    Estimates the length of a Vigenere key using the index of coincidence.
+
+    Multiples of the real key length score as well as the key length itself, so the
+    shortest length that comes close to the best score is chosen. Columns of a wrong
+    length mix several shifts and their index drifts towards that of random text.
+    """
+    return _estimate_key_length(*_letter_codes(ciphertext), max_key_length)
+
+
+def _estimate_key_length(positions: np.ndarray, codes: np.ndarray, max_key_length: int) -> int:
+    max_key_length = max(1, min(max_key_length, len(codes) // 2))
+    scores = [
+        index_of_coincidence(_column_counts(positions, codes, key_length))
+        for key_length in range(1, max_key_length + 1)
+    ]
+    threshold = max(scores) * 0.9
+    return next(i for i, score in enumerate(scores, 1) if score >= threshold)
+
+
+def break_vigenere(ciphertext: str, max_key_length: int = 20) -> str:
+    """
+    Recovers the keyword of an English text encrypted with a Vigenere cipher.
+
+    Every key column is a Caesar cipher, so its shift is found with the same
+    chi-squared scorer that breaks the Caesar cipher.
+
+    >>> plaintext = "it is a truth universally acknowledged that a single man in possession "
+    >>> plaintext += "of a good fortune must be in want of a wife"
+    >>> break_vigenere(encrypt_vigenere(plaintext * 4, "lemon"), max_key_length=8)
+    'lemon'
+    """
+    positions, codes = _letter_codes(ciphertext)
+    key_length = _estimate_key_length(positions, codes, max_key_length)
+    counts = _column_counts(positions, codes, key_length)
+    shifts = [int(np.argmin(chi_squared_scores(column.tolist()))) for column in counts]
+    return "".join(chr(ord("a") + shift) for shift in shifts)
@@ -0,0 +1,200 @@
+import argparse
+import functools
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+import typing as tp
+
+# sudoku.py - обычный модуль, делаем его доступным при запуске `python -m homework02`
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sudoku import (  # noqa: E402
+    DIFFICULTIES,
+    ENGINES,
+    SolverStats,
+    display,
+    generate_line,
+    read_sudoku,
+    solve,
+    solve_line,
+)
+
+
+def read_lines(files: tp.List[str]) -> tp.Iterator[str]:
+    """Пазлы по одному в строке, пустые строки и комментарии (#) пропускаются"""
+    for filename in files:
+        f = sys.stdin if filename == "-" else open(filename)
+        try:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+def solve_line_stats(line: str, engine: str, size: int) -> tp.Tuple[str, SolverStats]:
+    stats = SolverStats()
+    return solve_line(line, engine=engine, size=size, stats=stats), stats
+
+
+def cmd_solve(args: argparse.Namespace) -> None:
+    for filename in args.files:
+        grid = read_sudoku(filename)
+        display(grid)
+        stats = SolverStats() if args.stats else None
+        solution = solve(grid, engine=args.engine, stats=stats)
+        if not solution:
+            print(f"Puzzle {filename} can't be solved")
+        else:
+            display(solution)
+        if stats is not None:
+            print(f"{filename}: {stats}", file=sys.stderr)
+
+
+def cmd_solve_batch(args: argparse.Namespace) -> None:
+    workers = args.workers or os.cpu_count() or 1
+    # Пазлы отправляются в пул пачками, чтобы не читать весь файл в память
+    batch_size = workers * args.chunk_size * 4
+    lines = read_lines(args.files)
+    dst = open(args.output, "w") if args.output else sys.stdout
+    solved = 0
+    total = SolverStats()
+    slowest = (SolverStats(), "")
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            solver = functools.partial(solve_line_stats, engine=args.engine, size=args.size)
+            while True:
+                batch = list(itertools.islice(lines, batch_size))
+                if not batch:
+                    break
+                results = pool.imap(solver, batch, chunksize=args.chunk_size)
+                for line, (solution, stats) in zip(batch, results):
+                    dst.write(solution + "\n")
+                    total += stats
+                    if stats.elapsed > slowest[0].elapsed:
+                        slowest = (stats, line)
+                solved += len(batch)
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+    rate = solved / elapsed if elapsed else 0.0
+    print(f"Solved {solved} puzzles in {elapsed:.2f}s ({rate:.1f} puzzles/s)", file=sys.stderr)
+    if args.stats:
+        print(f"Total: {total}", file=sys.stderr)
+        print(f"Slowest: {slowest[0]} {slowest[1]}", file=sys.stderr)
+
+
+def cmd_generate(args: argparse.Namespace) -> None:
+    workers = args.workers or os.cpu_count() or 1
+    batch_size = workers * args.chunk_size * 4
+    seeds = itertools.count(args.seed if args.seed is not None else int(time.time() * 1000))
+    dst = open(args.output, "w") if args.output else sys.stdout
+    generated = 0
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            generator = functools.partial(generate_line, clues=args.clues)
+            while generated < args.count:
+                batch = list(itertools.islice(seeds, batch_size))
+                for line, difficulty in pool.imap(generator, batch, chunksize=args.chunk_size):
+                    if args.difficulty and difficulty != args.difficulty:
+                        continue
+                    dst.write(f"{line} {difficulty}\n")
+                    generated += 1
+                    if generated == args.count:
+                        break
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+    rate = generated / elapsed * 60 if elapsed else 0.0
+    print(
+        f"Generated {generated} puzzles in {elapsed:.2f}s ({rate:.0f} puzzles/min)", file=sys.stderr
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m homework02", description="Sudoku solver.")
+    subparsers = parser.add_subparsers(title="commands", dest="command")
+    subparsers.required = True
+
+    solve_parser = subparsers.add_parser(
+        "solve", help="Solve puzzles stored as grids (9x9, 16x16 or 25x25)."
+    )
+    solve_parser.add_argument("files", metavar="FILE", nargs="+")
+    solve_parser.set_defaults(func=cmd_solve)
+
+    batch_parser = subparsers.add_parser(
+        "solve-batch",
+        help="Solve puzzles stored one per line (81 characters, '0' or '.' for empty cells).",
+    )
+    batch_parser.add_argument(
+        "--size", type=int, default=9, help="Side of the puzzles, e.g. 16 for 256 characters."
+    )
+    batch_parser.add_argument(
+        "files", metavar="FILE", nargs="*", default=["-"], help="Input files, stdin by default."
+    )
+    batch_parser.add_argument("-o", "--output", help="Output file, stdout by default.")
+    batch_parser.add_argument(
+        "-j", "--workers", type=positive_int, default=None, help="Worker processes."
+    )
+    batch_parser.add_argument(
+        "--chunk-size", type=positive_int, default=256, help="Puzzles sent to a worker at a time."
+    )
+    batch_parser.set_defaults(func=cmd_solve_batch)
+
+    generate_parser = subparsers.add_parser(
+        "generate",
+        help="Generate puzzles with a unique solution, one per line followed by its difficulty.",
+    )
+    generate_parser.add_argument("-n", "--count", type=int, default=1, help="Number of puzzles.")
+    generate_parser.add_argument(
+        "--clues", type=int, default=17, help="Stop removing digits at this many clues."
+    )
+    generate_parser.add_argument(
+        "--difficulty", choices=DIFFICULTIES, help="Only output puzzles of this difficulty."
+    )
+    generate_parser.add_argument("--seed", type=int, help="Seed of the first puzzle.")
+    generate_parser.add_argument("-o", "--output", help="Output file, stdout by default.")
+    generate_parser.add_argument(
+        "-j", "--workers", type=positive_int, default=None, help="Worker processes."
+    )
+    generate_parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=16,
+        help="Puzzles generated by a worker at a time.",
+    )
+    generate_parser.set_defaults(func=cmd_generate)
+
+    for subparser in (solve_parser, batch_parser):
+        subparser.add_argument("--engine", choices=list(ENGINES), default="bitmask")
+        subparser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print search statistics (nodes, backtracks, depth, time) to stderr.",
+        )
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
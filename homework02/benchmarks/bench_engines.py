@@ -0,0 +1,76 @@
+"""
+Время решения пазлов разными решателями.
+
+    $ python benchmarks/bench_engines.py
+    $ python benchmarks/bench_engines.py --engines bitmask,dlx benchmarks/hard.txt
+
+Без аргументов решаются puzzle1.txt - puzzle3.txt и пазлы из benchmarks/hard.txt
+(по одному пазлу в строке, как у solve-batch: 81 символ, '0' или '.' - пустая клетка).
+"""
+
+import argparse
+import os
+import sys
+import time
+import typing as tp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sudoku import ENGINES, check_solution, parse_line, read_sudoku  # noqa: E402
+
+Grid = tp.List[tp.List[str]]
+
+
+def load(path: str) -> tp.List[tp.Tuple[str, Grid]]:
+    # Либо по пазлу в строке в формате solve-batch, либо один пазл в формате read_sudoku
+    with open(path) as f:
+        lines = [line.split()[0] for line in f if line.strip() and not line.startswith("#")]
+    name = os.path.basename(path)
+    try:
+        return [(f"{name}:{i}", parse_line(line)) for i, line in enumerate(lines, 1)]
+    except ValueError:
+        return [(name, read_sudoku(path))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Engines to compare.")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Skip an engine for the remaining puzzles once one takes longer (seconds).",
+    )
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+    files = args.files or [
+        os.path.join(ROOT, name) for name in ("puzzle1.txt", "puzzle2.txt", "puzzle3.txt")
+    ] + [os.path.join(ROOT, "benchmarks", "hard.txt")]
+    engines = args.engines.split(",")
+
+    puzzles = [puzzle for path in files for puzzle in load(path)]
+    totals = dict.fromkeys(engines, 0.0)
+    skipped: tp.Set[str] = set()
+    print(f"{'puzzle':<16}" + "".join(f"{engine:>14}" for engine in engines))
+    for name, grid in puzzles:
+        row = f"{name:<16}"
+        for engine in engines:
+            if engine in skipped:
+                row += f"{'-':>14}"
+                continue
+            puzzle = [list(line) for line in grid]
+            start = time.perf_counter()
+            solution = ENGINES[engine](puzzle, None)
+            elapsed = time.perf_counter() - start
+            assert solution is not None and check_solution(solution), (name, engine)
+            totals[engine] += elapsed
+            if elapsed > args.timeout:
+                skipped.add(engine)
+            row += f"{elapsed * 1000:>12.2f}ms"
+        print(row)
+    print(f"{'total':<16}" + "".join(f"{totals[engine] * 1000:>12.2f}ms" for engine in engines))
+
+
+if __name__ == "__main__":
+    main()
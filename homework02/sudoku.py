@@ -1,26 +1,182 @@
-from typing import Tuple, List, Set, Optional, cast
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    overload,
+)
+import copy
+import dataclasses
+import functools
+import itertools
+import math
+import operator
 import random
+import time
+
+import numpy as np
+
+# Символы цифр: 1-9 для судоку 9x9, дальше латинские буквы для 16x16 и 25x25
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+
+class Layout(NamedTuple):
+    """Геометрия пазла со стороной size = box * box, клетки пронумерованы по строкам"""
+
+    box: int
+    size: int
+    symbols: str
+    # Номера строки, столбца и квадрата для каждой клетки
+    row_of: List[int]
+    col_of: List[int]
+    box_of: List[int]
+    # Клетки каждой строки, затем каждого столбца, затем каждого квадрата
+    units: List[Tuple[int, ...]]
+    # Соседи клетки: все остальные клетки ее строки, столбца и квадрата
+    peers: List[Tuple[int, ...]]
+    box_getters: List[Callable[[Sequence[int]], Tuple[int, ...]]]
+    # Маска из size бит: бит d установлен, если цифра symbols[d] возможна (или уже занята)
+    all_digits: int
+    digit_of_bit: Dict[int, str]
+    bit_of_digit: Dict[str, int]
+    popcount: Callable[[int], int]
+
+    @property
+    def cells(self) -> int:
+        return self.size * self.size
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+@functools.lru_cache(maxsize=None)
+def get_layout(size: int = 9) -> Layout:
+    """Геометрия пазла size x size, поддерживаются 4x4, 9x9, 16x16 и 25x25
+
+    >>> layout = get_layout(16)
+    >>> layout.box, layout.cells, len(layout.peers[0])
+    (4, 256, 39)
+    """
+    box = math.isqrt(size)
+    if box * box != size or not 1 < size <= len(SYMBOLS):
+        raise ValueError(f"Unsupported sudoku size {size}")
+    cells = size * size
+    row_of = [cell // size for cell in range(cells)]
+    col_of = [cell % size for cell in range(cells)]
+    box_of = [cell // (size * box) * box + cell % size // box for cell in range(cells)]
+    units = [
+        tuple(cell for cell in range(cells) if of[cell] == i)
+        for of in (row_of, col_of, box_of)
+        for i in range(size)
+    ]
+    peers = [
+        tuple(
+            sorted(
+                set(
+                    units[row_of[cell]]
+                    + units[size + col_of[cell]]
+                    + units[2 * size + box_of[cell]]
+                )
+                - {cell}
+            )
+        )
+        for cell in range(cells)
+    ]
+    all_digits = (1 << size) - 1
+    digit_of_bit = {1 << d: SYMBOLS[d] for d in range(size)}
+    popcount: Callable[[int], int] = _popcount
+    if size <= 16:
+        popcount = [_popcount(mask) for mask in range(all_digits + 1)].__getitem__
+    return Layout(
+        box=box,
+        size=size,
+        symbols=SYMBOLS[:size],
+        row_of=row_of,
+        col_of=col_of,
+        box_of=box_of,
+        units=units,
+        peers=peers,
+        box_getters=[operator.itemgetter(*cells) for cells in units[2 * size :]],
+        all_digits=all_digits,
+        digit_of_bit=digit_of_bit,
+        bit_of_digit={digit: bit for bit, digit in digit_of_bit.items()},
+        popcount=popcount,
+    )
+
+
+# Компактное представление пазла: по байту на клетку, 0 - пустая клетка,
+# d - цифра symbols[d - 1]
+FlatGrid = bytearray
+
+
+def _flat_layout(flat: FlatGrid) -> Layout:
+    return get_layout(math.isqrt(len(flat)))
+
+
+def to_flat(grid: List[List[str]]) -> FlatGrid:
+    """Перевести пазл из списка списков в компактное представление
+
+    >>> to_flat(read_sudoku('puzzle1.txt'))[:9]
+    bytearray(b'\\x05\\x03\\x00\\x00\\x07\\x00\\x00\\x00\\x00')
+    """
+    symbols = get_layout(len(grid)).symbols
+    return bytearray(symbols.find(value) + 1 for row in grid for value in row)
+
+
+def from_flat(flat: FlatGrid) -> List[List[str]]:
+    """Перевести пазл из компактного представления в список списков
+
+    >>> grid = read_sudoku('puzzle1.txt')
+    >>> from_flat(to_flat(grid)) == grid
+    True
+    """
+    layout = _flat_layout(flat)
+    return group([layout.symbols[value - 1] if value else "." for value in flat], layout.size)
+
+
+def candidates_mask(flat: FlatGrid, cell: int) -> int:
+    """Маска цифр, которые можно поставить в клетку cell (бит d - цифра d)
+
+    >>> bin(candidates_mask(to_flat(read_sudoku('puzzle1.txt')), 2))
+    '0b10110'
+    """
+    layout = _flat_layout(flat)
+    used = 1 << flat[cell]
+    for peer in layout.peers[cell]:
+        used |= 1 << flat[peer]
+    return ~used & layout.all_digits << 1
 
 
 def read_sudoku(filename: str) -> List[List[str]]:
-    """ Прочитать Судоку из указанного файла """
-    digits = [c for c in open(filename).read() if c in "123456789."]
-    grid = group(digits, 9)
+    """Прочитать Судоку из указанного файла, размер определяется по числу клеток"""
+    digits = [c for c in open(filename).read() if c in SYMBOLS or c == "."]
+    grid = group(digits, math.isqrt(len(digits)))
     return grid
 
 
 def display(grid: List[List[str]]) -> None:
-    """Вывод Судоку """
+    """Вывод Судоку"""
     width = 2
-    line = "+".join(["-" * (width * 3)] * 3)
-    for row in range(9):
+    size = len(grid)
+    box = math.isqrt(size)
+    line = "+".join(["-" * (width * box)] * box)
+    for row in range(size):
         print(
             "".join(
-                grid[row][col].center(width) + ("|" if str(col) in "25" else "")
-                for col in range(9)
+                grid[row][col].center(width)
+                + ("|" if col % box == box - 1 and col < size - 1 else "")
+                for col in range(size)
             )
         )
-        if str(row) in "25":
+        if row % box == box - 1 and row < size - 1:
             print(line)
     print()
 
@@ -37,7 +193,19 @@ def group(values: List[str], n: int) -> List[List[str]]:
     return [values[x : x + n] for x in range(0, len(values), n)]
 
 
+@overload
 def get_row(grid: List[List[str]], pos: Tuple[int, int]) -> List[str]:
+    ...
+
+
+@overload
+def get_row(grid: FlatGrid, pos: Tuple[int, int]) -> memoryview:
+    ...
+
+
+def get_row(
+    grid: Union[List[List[str]], FlatGrid], pos: Tuple[int, int]
+) -> Union[List[str], memoryview]:
     """Возвращает все значения для номера строки, указанной в pos
 
     >>> get_row([['1', '2', '.'], ['4', '5', '6'], ['7', '8', '9']], (0, 0))
@@ -46,11 +214,28 @@ def get_row(grid: List[List[str]], pos: Tuple[int, int]) -> List[str]:
     ['4', '.', '6']
     >>> get_row([['1', '2', '3'], ['4', '5', '6'], ['.', '8', '9']], (2, 0))
     ['.', '8', '9']
+    >>> list(get_row(to_flat(read_sudoku('puzzle1.txt')), (1, 0)))
+    [6, 0, 0, 1, 9, 5, 0, 0, 0]
     """
+    if isinstance(grid, FlatGrid):
+        size = math.isqrt(len(grid))
+        return memoryview(grid)[pos[0] * size : pos[0] * size + size]
     return grid[pos[0]]
 
 
+@overload
 def get_col(grid: List[List[str]], pos: Tuple[int, int]) -> List[str]:
+    ...
+
+
+@overload
+def get_col(grid: FlatGrid, pos: Tuple[int, int]) -> memoryview:
+    ...
+
+
+def get_col(
+    grid: Union[List[List[str]], FlatGrid], pos: Tuple[int, int]
+) -> Union[List[str], memoryview]:
     """Возвращает все значения для номера столбца, указанного в pos
 
     >>> get_col([['1', '2', '.'], ['4', '5', '6'], ['7', '8', '9']], (0, 0))
@@ -59,11 +244,27 @@ def get_col(grid: List[List[str]], pos: Tuple[int, int]) -> List[str]:
     ['2', '.', '8']
     >>> get_col([['1', '2', '3'], ['4', '5', '6'], ['.', '8', '9']], (0, 2))
     ['3', '6', '9']
+    >>> list(get_col(to_flat(read_sudoku('puzzle1.txt')), (0, 1)))
+    [3, 0, 9, 0, 0, 0, 6, 0, 0]
     """
+    if isinstance(grid, FlatGrid):
+        return memoryview(grid)[pos[1] :: math.isqrt(len(grid))]
     return [grid[i][pos[1]] for i in range(len(grid))]
 
 
+@overload
 def get_block(grid: List[List[str]], pos: Tuple[int, int]) -> List[str]:
+    ...
+
+
+@overload
+def get_block(grid: FlatGrid, pos: Tuple[int, int]) -> Tuple[int, ...]:
+    ...
+
+
+def get_block(
+    grid: Union[List[List[str]], FlatGrid], pos: Tuple[int, int]
+) -> Union[List[str], Tuple[int, ...]]:
     """Возвращает все значения из квадрата, в который попадает позиция pos
 
     >>> grid = read_sudoku('puzzle1.txt')
@@ -73,11 +274,17 @@ def get_block(grid: List[List[str]], pos: Tuple[int, int]) -> List[str]:
     ['.', '.', '3', '.', '.', '1', '.', '.', '6']
     >>> get_block(grid, (8, 8))
     ['2', '8', '.', '.', '.', '5', '.', '7', '9']
+    >>> get_block(to_flat(grid), (8, 8))
+    (2, 8, 0, 0, 0, 5, 0, 7, 9)
     """
+    if isinstance(grid, FlatGrid):
+        layout = _flat_layout(grid)
+        return layout.box_getters[layout.box_of[pos[0] * layout.size + pos[1]]](grid)
+    box = math.isqrt(len(grid))
     return [
         grid[i][j]
-        for i in range(pos[0] // 3 * 3, pos[0] // 3 * 3 + 3)
-        for j in range(pos[1] // 3 * 3, pos[1] // 3 * 3 + 3)
+        for i in range(pos[0] // box * box, pos[0] // box * box + box)
+        for j in range(pos[1] // box * box, pos[1] // box * box + box)
     ]
 
 
@@ -92,15 +299,24 @@ def find_empty_positions(grid: List[List[str]]) -> Optional[Tuple[int, int]]:
     (2, 0)
     """
     empty_positions = [
-        (i, j)
-        for i in range(len(grid))
-        for j in range(len(grid[i]))
-        if grid[i][j] == "."
+        (i, j) for i in range(len(grid)) for j in range(len(grid[i])) if grid[i][j] == "."
     ]
     return empty_positions[0] if len(empty_positions) > 0 else None
 
 
+@overload
 def find_possible_values(grid: List[List[str]], pos: Tuple[int, int]) -> Set[str]:
+    ...
+
+
+@overload
+def find_possible_values(grid: FlatGrid, pos: Tuple[int, int]) -> Set[int]:
+    ...
+
+
+def find_possible_values(
+    grid: Union[List[List[str]], FlatGrid], pos: Tuple[int, int]
+) -> Union[Set[str], Set[int]]:
     """Вернуть множество возможных значения для указанной позиции
 
     >>> grid = read_sudoku('puzzle1.txt')
@@ -110,17 +326,66 @@ def find_possible_values(grid: List[List[str]], pos: Tuple[int, int]) -> Set[str
     >>> values = find_possible_values(grid, (4,7))
     >>> values == {'2', '5', '9'}
     True
+    >>> sorted(find_possible_values(to_flat(grid), (4,7)))
+    [2, 5, 9]
     """
-    numbers = set(["1", "2", "3", "4", "5", "6", "7", "8", "9"])
+    if isinstance(grid, FlatGrid):
+        size = math.isqrt(len(grid))
+        mask = candidates_mask(grid, pos[0] * size + pos[1])
+        return {digit for digit in range(1, size + 1) if mask >> digit & 1}
+    numbers = set(SYMBOLS[: len(grid)])
     return numbers.difference(
-        set(get_row(grid, pos)).union(
-            set(get_col(grid, pos)), set(get_block(grid, pos))
-        )
+        set(get_row(grid, pos)).union(set(get_col(grid, pos)), set(get_block(grid, pos)))
     )
 
 
-def solve(grid: List[List[str]]) -> Optional[List[List[str]]]:
-    """ Решение пазла, заданного в grid """
+@dataclasses.dataclass
+class SolverStats:
+    """
+    Статистика решения пазла, которую собирает solve(grid, stats=...).
+
+    nodes - узлы дерева перебора, backtracks - сколько раз пробная цифра оказалась
+    неверной и ее пришлось убрать, max_depth - наибольшая глубина перебора,
+    propagations - шаги распространения ограничений (цифры, расставленные
+    без перебора, у Dancing Links - покрытые столбцы), elapsed - время в секундах.
+
+    >>> stats = SolverStats()
+    >>> check_solution(solve(read_sudoku('puzzle1.txt'), stats=stats))
+    True
+    >>> stats.nodes, stats.backtracks, stats.propagations
+    (1, 0, 51)
+    """
+
+    nodes: int = 0
+    backtracks: int = 0
+    max_depth: int = 0
+    propagations: int = 0
+    elapsed: float = 0.0
+
+    def visit(self, depth: int) -> None:
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def __iadd__(self, other: "SolverStats") -> "SolverStats":
+        self.nodes += other.nodes
+        self.backtracks += other.backtracks
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.propagations += other.propagations
+        self.elapsed += other.elapsed
+        return self
+
+    def __str__(self) -> str:
+        return (
+            f"nodes={self.nodes} backtracks={self.backtracks} max_depth={self.max_depth} "
+            f"propagations={self.propagations} time={self.elapsed * 1000:.2f}ms"
+        )
+
+
+def solve_backtracking(
+    grid: List[List[str]], stats: Optional[SolverStats] = None, depth: int = 0
+) -> Optional[List[List[str]]]:
+    """Решение пазла, заданного в grid (depth - глубина рекурсии для статистики stats)"""
     """ Как решать Судоку?
         1. Найти свободную позицию
         2. Найти все возможные значения, которые могут находиться на этой позиции
@@ -129,9 +394,11 @@ def solve(grid: List[List[str]]) -> Optional[List[List[str]]]:
             3.2. Продолжить решать оставшуюся часть пазла
 
     >>> grid = read_sudoku('puzzle1.txt')
-    >>> solve(grid)
+    >>> solve_backtracking(grid)
     [['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']]
     """
+    if stats is not None:
+        stats.visit(depth)
     empty_position = find_empty_positions(grid)
     if empty_position is None:
         return grid
@@ -140,14 +407,406 @@ def solve(grid: List[List[str]]) -> Optional[List[List[str]]]:
         return None
     for value in possible_values:
         grid[empty_position[0]][empty_position[1]] = value
-        solution = solve(grid)
+        solution = solve_backtracking(grid, stats, depth + 1)
         if solution:
             return solution
         grid[empty_position[0]][empty_position[1]] = "."
+        if stats is not None:
+            stats.backtracks += 1
     return None
 
 
-def check_solution(solution: List[List[str]]) -> bool:
+class BitmaskSolver:
+    """
+    Решатель, который хранит занятые цифры каждой строки, столбца и квадрата
+    в виде битовых масок (по биту на цифру) и обновляет их при каждой расстановке цифры.
+    Работает с пазлами любого размера из get_layout: для 25x25 маски занимают
+    25 бит и по-прежнему помещаются в одно машинное слово.
+
+    На каждом шаге сначала расставляются единственные кандидаты (naked singles)
+    и цифры, которым осталось одно место в строке, столбце или квадрате (hidden
+    singles), а перебор ведется по клетке с наименьшим числом кандидатов.
+    """
+
+    def __init__(self, grid: List[List[str]], stats: Optional[SolverStats] = None) -> None:
+        self.stats = stats
+        self.layout = layout = get_layout(len(grid))
+        self.row_of, self.col_of, self.box_of = layout.row_of, layout.col_of, layout.box_of
+        self.values = [layout.bit_of_digit.get(value, 0) for row in grid for value in row]
+        self.rows = [0] * layout.size
+        self.cols = [0] * layout.size
+        self.boxes = [0] * layout.size
+        for cell, bit in enumerate(self.values):
+            self.rows[self.row_of[cell]] |= bit
+            self.cols[self.col_of[cell]] |= bit
+            self.boxes[self.box_of[cell]] |= bit
+
+    def candidates(self, cell: int) -> int:
+        return self.layout.all_digits & ~(
+            self.rows[self.row_of[cell]]
+            | self.cols[self.col_of[cell]]
+            | self.boxes[self.box_of[cell]]
+        )
+
+    def place(self, cell: int, bit: int) -> None:
+        self.values[cell] = bit
+        self.rows[self.row_of[cell]] |= bit
+        self.cols[self.col_of[cell]] |= bit
+        self.boxes[self.box_of[cell]] |= bit
+
+    def remove(self, cell: int) -> None:
+        bit = ~self.values[cell]
+        self.values[cell] = 0
+        self.rows[self.row_of[cell]] &= bit
+        self.cols[self.col_of[cell]] &= bit
+        self.boxes[self.box_of[cell]] &= bit
+
+    def propagate(self, trail: List[int]) -> Optional[Tuple[int, int]]:
+        """
+        Расставляет все одиночки, добавляя заполненные клетки в trail.
+
+        Возвращает клетку с наименьшим числом кандидатов и ее кандидатов, (-1, 0),
+        если пазл решен, и None, если найдено противоречие.
+        """
+        values = self.values
+        popcount = self.layout.popcount
+        while True:
+            placed = False
+            best_cell, best_mask, best_count = -1, 0, self.layout.size + 1
+            for cell in range(self.layout.cells):
+                if values[cell]:
+                    continue
+                mask = self.candidates(cell)
+                if not mask:
+                    return None
+                if not mask & (mask - 1):
+                    self.place(cell, mask)
+                    trail.append(cell)
+                    placed = True
+                elif popcount(mask) < best_count:
+                    best_cell, best_mask, best_count = cell, mask, popcount(mask)
+            if placed:
+                continue
+            if best_cell == -1:
+                return best_cell, best_mask
+
+            for unit in self.layout.units:
+                once = twice = 0
+                for cell in unit:
+                    if not values[cell]:
+                        mask = self.candidates(cell)
+                        twice |= once & mask
+                        once |= mask
+                hidden = once & ~twice
+                if not hidden:
+                    continue
+                for cell in unit:
+                    if values[cell]:
+                        continue
+                    bit = self.candidates(cell) & hidden
+                    if bit & (bit - 1):
+                        # Две цифры могут стоять только в этой клетке
+                        return None
+                    if bit:
+                        self.place(cell, bit)
+                        trail.append(cell)
+                        placed = True
+            if not placed:
+                return best_cell, best_mask
+
+    def solutions(self, depth: int = 0) -> Iterator[List[int]]:
+        """Перебрать все решения, каждое решение - список битов цифр всех клеток"""
+        stats = self.stats
+        trail: List[int] = []
+        branch = self.propagate(trail)
+        if stats is not None:
+            stats.visit(depth)
+            stats.propagations += len(trail)
+        if branch is not None:
+            cell, mask = branch
+            if cell == -1:
+                yield list(self.values)
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                self.place(cell, bit)
+                yield from self.solutions(depth + 1)
+                self.remove(cell)
+                if stats is not None:
+                    stats.backtracks += 1
+        for cell in reversed(trail):
+            self.remove(cell)
+
+    def to_grid(self, values: List[int]) -> List[List[str]]:
+        return group([self.layout.digit_of_bit.get(bit, ".") for bit in values], self.layout.size)
+
+
+def solve_bitmask(
+    grid: List[List[str]], stats: Optional[SolverStats] = None
+) -> Optional[List[List[str]]]:
+    """Решение пазла с помощью битовых масок и распространения ограничений
+
+    >>> grid = read_sudoku('puzzle2.txt')
+    >>> check_solution(solve_bitmask(grid))
+    True
+    """
+    solver = BitmaskSolver(grid, stats)
+    solution = next(solver.solutions(), None)
+    return solver.to_grid(solution) if solution is not None else None
+
+
+class DancingLinks:
+    """
+    Алгоритм X Кнута на танцующих ссылках для задачи точного покрытия.
+
+    Узлы хранятся в параллельных списках: узел 0 - корень, узлы 1..columns -
+    заголовки столбцов, остальные - единицы матрицы.
+    """
+
+    def __init__(self, columns: int, rows: List[List[int]]) -> None:
+        self.left = [(i - 1) % (columns + 1) for i in range(columns + 1)]
+        self.right = [(i + 1) % (columns + 1) for i in range(columns + 1)]
+        self.up = list(range(columns + 1))
+        self.down = list(range(columns + 1))
+        self.column = list(range(columns + 1))
+        self.row_of = [-1] * (columns + 1)
+        self.size = [0] * (columns + 1)
+        self.stats: Optional[SolverStats] = None
+        # Первый узел каждой строки матрицы
+        self.first: List[int] = []
+        for row, row_columns in enumerate(rows):
+            first = len(self.column)
+            self.first.append(first)
+            for i, col in enumerate(row_columns):
+                node = len(self.column)
+                header = col + 1
+                self.column.append(header)
+                self.row_of.append(row)
+                self.up.append(self.up[header])
+                self.down.append(header)
+                self.down[self.up[header]] = node
+                self.up[header] = node
+                self.size[header] += 1
+                self.left.append(node - 1 if i else first + len(row_columns) - 1)
+                self.right.append(node + 1 if i < len(row_columns) - 1 else first)
+
+    def copy(self) -> "DancingLinks":
+        links = copy.copy(self)
+        for name in ("left", "right", "up", "down", "size"):
+            setattr(links, name, list(getattr(self, name)))
+        return links
+
+    def cover(self, header: int) -> None:
+        left, right, up, down, column, size = (
+            self.left,
+            self.right,
+            self.up,
+            self.down,
+            self.column,
+            self.size,
+        )
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header: int) -> None:
+        left, right, up, down, column, size = (
+            self.left,
+            self.right,
+            self.up,
+            self.down,
+            self.column,
+            self.size,
+        )
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def select(self, row: int) -> bool:
+        """Заранее включить строку row в покрытие, False - если она конфликтует с уже выбранными"""
+        node = self.first[row]
+        while True:
+            header = self.column[node]
+            if self.right[self.left[header]] != header:
+                return False
+            self.cover(header)
+            node = self.right[node]
+            if node == self.first[row]:
+                return True
+
+    def solutions(self) -> Iterator[List[int]]:
+        """Перебрать все точные покрытия, каждое - список номеров строк"""
+        selected: List[int] = []
+        yield from self._search(selected)
+
+    def _search(self, selected: List[int]) -> Iterator[List[int]]:
+        right, down, column, size, stats = self.right, self.down, self.column, self.size, self.stats
+        if stats is not None:
+            stats.visit(len(selected))
+        if right[0] == 0:
+            yield list(selected)
+            return
+        # Столбец с наименьшим числом единиц
+        header, best = 0, -1
+        col = right[0]
+        while col != 0:
+            if best == -1 or size[col] < best:
+                header, best = col, size[col]
+                if best <= 1:
+                    break
+            col = right[col]
+        if best == 0:
+            return
+        self.cover(header)
+        node = down[header]
+        while node != header:
+            selected.append(self.row_of[node])
+            j = right[node]
+            while j != node:
+                self.cover(column[j])
+                if stats is not None:
+                    stats.propagations += 1
+                j = right[j]
+            yield from self._search(selected)
+            j = self.left[node]
+            while j != node:
+                self.uncover(column[j])
+                j = self.left[j]
+            selected.pop()
+            if stats is not None:
+                stats.backtracks += 1
+            node = down[node]
+        self.uncover(header)
+
+
+@functools.lru_cache(maxsize=None)
+def _sudoku_links(size: int = 9) -> DancingLinks:
+    # Строка cell * size + d - цифра symbols[d] в клетке cell, она покрывает 4 ограничения:
+    # клетка заполнена и цифра есть в строке, столбце и квадрате
+    layout = get_layout(size)
+    cells = layout.cells
+    rows = [
+        [
+            cell,
+            cells + layout.row_of[cell] * size + d,
+            2 * cells + layout.col_of[cell] * size + d,
+            3 * cells + layout.box_of[cell] * size + d,
+        ]
+        for cell in range(cells)
+        for d in range(size)
+    ]
+    return DancingLinks(4 * cells, rows)
+
+
+def dlx_solutions(
+    grid: List[List[str]], stats: Optional[SolverStats] = None
+) -> Iterator[List[List[str]]]:
+    """Перебрать все решения пазла с помощью Dancing Links
+
+    >>> grid = read_sudoku('puzzle1.txt')
+    >>> len(list(dlx_solutions(grid)))
+    1
+    """
+    # Матрица одна и та же для всех пазлов, копировать списки быстрее, чем строить ее
+    layout = get_layout(len(grid))
+    size = layout.size
+    links = _sudoku_links(size).copy()
+    links.stats = stats
+    givens = []
+    for cell, value in enumerate(value for row in grid for value in row):
+        if value in layout.bit_of_digit:
+            givens.append(cell * size + layout.symbols.index(value))
+            if not links.select(givens[-1]):
+                return
+    for rows in links.solutions():
+        values = ["."] * layout.cells
+        for row in givens + rows:
+            values[row // size] = layout.symbols[row % size]
+        yield group(values, size)
+
+
+def solve_dlx(
+    grid: List[List[str]], stats: Optional[SolverStats] = None
+) -> Optional[List[List[str]]]:
+    """Решение пазла с помощью Dancing Links
+
+    >>> grid = read_sudoku('puzzle3.txt')
+    >>> check_solution(solve_dlx(grid))
+    True
+    """
+    return next(dlx_solutions(grid, stats), None)
+
+
+def bitmask_solutions(grid: List[List[str]]) -> Iterator[List[List[str]]]:
+    solver = BitmaskSolver(grid)
+    return (solver.to_grid(values) for values in solver.solutions())
+
+
+SOLUTIONS: Dict[str, Callable[[List[List[str]]], Iterator[List[List[str]]]]] = {
+    "bitmask": bitmask_solutions,
+    "dlx": dlx_solutions,
+}
+
+
+def count_solutions(grid: List[List[str]], limit: Optional[int] = None, engine: str = "dlx") -> int:
+    """Посчитать решения пазла, но не больше limit
+
+    >>> count_solutions(read_sudoku('puzzle1.txt'))
+    1
+    >>> count_solutions([['.'] * 9 for _ in range(9)], limit=2)
+    2
+    """
+    if engine not in SOLUTIONS:
+        raise ValueError(f"Unknown engine {engine!r}, choose one of {', '.join(SOLUTIONS)}")
+    return sum(1 for _ in itertools.islice(SOLUTIONS[engine](grid), limit))
+
+
+ENGINES: Dict[
+    str, Callable[[List[List[str]], Optional[SolverStats]], Optional[List[List[str]]]]
+] = {
+    "backtracking": solve_backtracking,
+    "bitmask": solve_bitmask,
+    "dlx": solve_dlx,
+}
+
+
+def solve(
+    grid: List[List[str]], engine: str = "bitmask", stats: Optional[SolverStats] = None
+) -> Optional[List[List[str]]]:
+    """Решение пазла, заданного в grid, с помощью выбранного решателя engine
+
+    Если передан stats, в него добавляется статистика решения.
+
+    >>> grid = read_sudoku('puzzle1.txt')
+    >>> solve(grid)
+    [['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']]
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, choose one of {', '.join(ENGINES)}")
+    start = time.perf_counter()
+    solution = ENGINES[engine](grid, stats)
+    if stats is not None:
+        stats.elapsed += time.perf_counter() - start
+    return solution
+
+
+def check_solution(solution: Union[List[List[str]], FlatGrid]) -> bool:
     """Если решение solution верно, то вернуть True, в противном случае False
     >>> check_solution([['5', '5', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']])
     False
@@ -155,24 +814,199 @@ def check_solution(solution: List[List[str]]) -> bool:
     False
     >>> check_solution([['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '5', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']])
     False
+    >>> check_solution(to_flat(solve(read_sudoku('puzzle1.txt'))))
+    True
     """
-    numbers = set(["1", "2", "3", "4", "5", "6", "7", "8", "9"])
-    for i in range(9):
+    if isinstance(solution, FlatGrid):
+        layout = _flat_layout(solution)
+        for unit in layout.units:
+            seen = 0
+            for cell in unit:
+                seen |= 1 << solution[cell]
+            if seen != layout.all_digits << 1:
+                return False
+        return True
+    size = len(solution)
+    box = math.isqrt(size)
+    if box * box != size or any(len(row) != size for row in solution):
+        return False
+    numbers = set(SYMBOLS[:size])
+    for i in range(size):
         numbers_in_row = get_row(solution, (i, 0))
         if set(numbers_in_row) != numbers:
             return False
-    for i in range(9):
+    for i in range(size):
         numbers_in_col = get_col(solution, (0, i))
         if set(numbers_in_col) != numbers:
             return False
-    for i in range(3):
-        for j in range(3):
-            numbers_in_block = get_block(solution, (i + 3 * i, j + 3 * j))
+    for i in range(box):
+        for j in range(box):
+            numbers_in_block = get_block(solution, (i * box, j * box))
             if set(numbers_in_block) != numbers:
                 return False
     return True
 
 
+# Сколько пазлов check_solutions проверяет за раз: промежуточные массивы
+# такой пачки помещаются в кэш процессора
+CHECK_CHUNK_SIZE = 1 << 12
+
+
+def to_array(grids: Iterable[List[List[str]]], size: int = 9) -> np.ndarray:
+    """Собрать пазлы в массив (N, size, size) из uint8 в кодировке to_flat
+
+    >>> to_array([read_sudoku('puzzle1.txt')]).shape
+    (1, 9, 9)
+    """
+    data = b"".join(to_flat(grid) for grid in grids)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, size, size)
+
+
+def check_solutions(array: np.ndarray) -> np.ndarray:
+    """Проверить сразу много решений, array - массив (N, size, size) из uint8 с цифрами 1..size
+
+    Каждая цифра d превращается в маску 1 << d, маски строк, столбцов и квадратов
+    собираются побитовым ИЛИ срезов массива, и решение верно, если все маски полные.
+    Возвращает массив из N булевых значений.
+
+    >>> solution = to_array([solve(read_sudoku('puzzle1.txt'))])
+    >>> wrong = solution.copy()
+    >>> wrong[0, 0, :2] = wrong[0, 0, 1::-1]
+    >>> check_solutions(np.concatenate([solution, wrong]))
+    array([ True, False])
+    """
+    size = array.shape[1]
+    layout = get_layout(size)
+    box = layout.box
+    full = layout.all_digits << 1
+    # Пустым клеткам и цифрам вне 1..size соответствует маска 0, и юнит не будет полным
+    masks_of = np.zeros(256, dtype=np.uint16 if size < 16 else np.uint32)
+    masks_of[1 : size + 1] = 1 << np.arange(1, size + 1)
+    result = np.empty(array.shape[0], dtype=bool)
+    for start in range(0, array.shape[0], CHECK_CHUNK_SIZE):
+        masks = masks_of.take(array[start : start + CHECK_CHUNK_SIZE])
+        rows = masks[:, :, 0].copy()
+        cols = masks[:, 0, :].copy()
+        for i in range(1, size):
+            rows |= masks[:, :, i]
+            cols |= masks[:, i, :]
+        # Оси: пазл, полоса квадратов, строка в квадрате, стек квадратов, столбец в квадрате
+        cells = masks.reshape(-1, box, box, box, box)
+        boxes = cells[:, :, 0, :, 0].copy()
+        for i, j in itertools.product(range(box), repeat=2):
+            boxes |= cells[:, :, i, :, j]
+        result[start : start + CHECK_CHUNK_SIZE] = (
+            (rows == full).all(axis=1)
+            & (cols == full).all(axis=1)
+            & (boxes == full).all(axis=(1, 2))
+        )
+    return result
+
+
+def random_solution(size: int = 9, rng: Optional[random.Random] = None) -> List[List[str]]:
+    """Случайное решенное судоку size x size
+
+    Квадраты на диагонали не пересекаются, поэтому их можно заполнить
+    случайными перестановками цифр, а остальное дорешать. Случайные числа берутся
+    из rng, а без него - из общего генератора модуля random.
+
+    >>> check_solution(random_solution())
+    True
+    >>> check_solution(random_solution(16))
+    True
+    """
+    layout = get_layout(size)
+    box = layout.box
+    while True:
+        grid = [["."] * size for _ in range(size)]
+        for k in range(box):
+            digits = (rng or random).sample(layout.symbols, size)
+            for i, digit in enumerate(digits):
+                grid[k * box + i // box][k * box + i % box] = digit
+        solution = solve(grid)
+        # Для 4x4 не всякое заполнение диагонали можно дорешать
+        if solution is not None:
+            return solution
+
+
+def generate_unique_sudoku(
+    clues: int = 17, size: int = 9, rng: Optional[random.Random] = None
+) -> List[List[str]]:
+    """Генерация судоку с единственным решением
+
+    Из случайного решения по одной в случайном порядке убираются цифры, если
+    пазл после этого по-прежнему имеет единственное решение. Генерация останавливается,
+    когда осталось clues цифр или больше ни одну цифру убрать нельзя. Случайные
+    числа берутся из rng, как в random_solution.
+
+    >>> grid = generate_unique_sudoku(30)
+    >>> sum(1 for row in grid for e in row if e != '.') >= 30
+    True
+    >>> count_solutions(grid, limit=2)
+    1
+    """
+    grid = random_solution(size, rng)
+    positions = [(i, j) for i in range(size) for j in range(size)]
+    (rng or random).shuffle(positions)
+    filled = size * size
+    for i, j in positions:
+        if filled <= clues:
+            break
+        value, grid[i][j] = grid[i][j], "."
+        if count_solutions(grid, limit=2, engine="bitmask") == 1:
+            filled -= 1
+        else:
+            grid[i][j] = value
+    return grid
+
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def grade_difficulty(grid: List[List[str]]) -> str:
+    """Оценить сложность пазла по приемам, которые нужны для его решения
+
+    easy - хватает клеток с единственным кандидатом (naked singles),
+    medium - нужны цифры с единственным местом в строке, столбце или квадрате
+    (hidden singles), hard - без перебора не обойтись.
+
+    >>> grade_difficulty(read_sudoku('puzzle1.txt'))
+    'easy'
+    >>> grade_difficulty(parse_line("8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."))
+    'hard'
+    """
+    solver = BitmaskSolver(grid)
+    layout = solver.layout
+    level = 0
+    while True:
+        empty = [cell for cell in range(layout.cells) if not solver.values[cell]]
+        if not empty:
+            return DIFFICULTIES[level]
+        placed = False
+        for cell in empty:
+            mask = solver.candidates(cell)
+            if layout.popcount(mask) == 1:
+                solver.place(cell, mask)
+                placed = True
+        if placed:
+            continue
+        for unit in layout.units:
+            for bit in layout.digit_of_bit:
+                cells = [c for c in unit if not solver.values[c] and solver.candidates(c) & bit]
+                if len(cells) == 1:
+                    solver.place(cells[0], bit)
+                    placed = True
+        if not placed:
+            return DIFFICULTIES[-1]
+        level = max(level, 1)
+
+
+def generate_line(seed: int, clues: int = 17) -> Tuple[str, str]:
+    """Сгенерировать пазл для номера seed и вернуть его в виде строки вместе со сложностью"""
+    grid = generate_unique_sudoku(clues, rng=random.Random(seed))
+    return format_line(grid), grade_difficulty(grid)
+
+
 def generate_sudoku(N: int) -> List[List[str]]:
     """Генерация судоку заполненного на N элементов
 
@@ -196,7 +1030,7 @@ def generate_sudoku(N: int) -> List[List[str]]:
     True
     """
     N = 81 if N > 81 else N
-    grid = cast(List[List[str]], solve([["." for i in range(9)] for j in range(9)]))
+    grid = random_solution()
     positions = [(i, j) for i in range(0, 9) for j in range(0, 9)]
     for i in range(81 - N):
         cell = random.randint(0, len(positions) - 1)
@@ -205,6 +1039,49 @@ def generate_sudoku(N: int) -> List[List[str]]:
     return grid
 
 
+def parse_line(line: str, size: int = 9) -> List[List[str]]:
+    """Прочитать пазл size x size, записанный в одну строку ('0' или '.' - пустая клетка)
+
+    Строка другой длины или с посторонними символами - ValueError.
+
+    >>> parse_line("53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79")[0]
+    ['5', '3', '.', '.', '7', '.', '.', '.', '.']
+    >>> parse_line("1234")
+    Traceback (most recent call last):
+    ...
+    ValueError: Invalid 9x9 puzzle: '1234'
+    """
+    allowed = set(get_layout(size).symbols + "0.")
+    if len(line) != size * size or not allowed.issuperset(line):
+        raise ValueError(f"Invalid {size}x{size} puzzle: {line!r}")
+    return group(["." if value in "0." else value for value in line], size)
+
+
+def format_line(grid: List[List[str]]) -> str:
+    """Записать пазл в одну строку
+
+    >>> format_line(parse_line("1" + "0" * 80))[:3]
+    '1..'
+    """
+    return "".join(value for row in grid for value in row)
+
+
+def solve_line(
+    line: str, engine: str = "bitmask", size: int = 9, stats: Optional[SolverStats] = None
+) -> str:
+    """Решить пазл, записанный в одну строку, для нерешаемого или некорректного пазла
+    вернуть пустую строку. Все после первого пробела (например, сложность, которую
+    пишет generate) пропускается.
+    """
+    fields = line.split(maxsplit=1)
+    try:
+        grid = parse_line(fields[0] if fields else "", size)
+    except ValueError:
+        return ""
+    solution = solve(grid, engine=engine, stats=stats)
+    return format_line(solution) if solution else ""
+
+
 if __name__ == "__main__":
     for fname in ["puzzle1.txt", "puzzle2.txt", "puzzle3.txt"]:
         grid = read_sudoku(fname)
@@ -0,0 +1,80 @@
+import contextlib
+import importlib.util
+import io
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+import sudoku
+
+# __main__.py нельзя импортировать по имени, поэтому он загружается по пути. Модуль
+# регистрируется в sys.modules, чтобы пул процессов мог передать его функции.
+_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__main__.py")
+_spec = importlib.util.spec_from_file_location("homework02_cli", _path)
+assert _spec is not None and _spec.loader is not None
+cli = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = cli
+_spec.loader.exec_module(cli)
+
+PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+SOLUTION = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+
+
+class CliTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = pathlib.Path(tmp.name)
+
+    def parse(self, argv):
+        return cli.build_parser().parse_args(argv)
+
+    def run_command(self, argv):
+        args = self.parse(argv)
+        with contextlib.redirect_stderr(io.StringIO()):
+            args.func(args)
+
+    def test_solve_batch_keeps_order_across_batches(self):
+        # Пазлы отличаются перестановкой цифр, решения - той же перестановкой
+        digits = "123456789"
+        puzzles, expected = [], []
+        for k in range(20):
+            shifted = digits[k % 9 :] + digits[: k % 9]
+            table = str.maketrans(digits, shifted)
+            puzzles.append(PUZZLE.translate(table))
+            expected.append(SOLUTION.translate(table))
+        puzzles[3], expected[3] = "1234", ""
+        puzzles[7], expected[7] = "11" + "0" * 79, ""
+        source, output = self.tmp / "puzzles.txt", self.tmp / "solutions.txt"
+        source.write_text("\n".join(puzzles) + "\n")
+        # Один процесс и пачки по 4 пазла: 20 пазлов идут пятью пачками
+        argv = ["solve-batch", "-j", "1", "--chunk-size", "1", "-o", str(output), str(source)]
+        self.run_command(argv)
+        self.assertEqual(expected, output.read_text().split("\n")[:-1])
+
+    def test_generate(self):
+        output = self.tmp / "generated.txt"
+        argv = ["generate", "-n", "3", "--seed", "1", "--clues", "30"]
+        argv += ["-j", "1", "--chunk-size", "1"]
+        self.run_command(argv + ["-o", str(output)])
+        lines = output.read_text().splitlines()
+        self.assertEqual(3, len(lines))
+        for line in lines:
+            puzzle, difficulty = line.split()
+            self.assertIn(difficulty, sudoku.DIFFICULTIES)
+            self.assertEqual(1, sudoku.count_solutions(sudoku.parse_line(puzzle), limit=2))
+
+    def test_invalid_arguments(self):
+        cases = [
+            ["solve-batch", "--chunk-size", "0"],
+            ["solve-batch", "-j", "-1"],
+            ["generate", "--chunk-size", "-3"],
+            ["generate", "--workers", "0"],
+        ]
+        for argv in cases:
+            with self.subTest(argv=argv):
+                with contextlib.redirect_stderr(io.StringIO()):
+                    with self.assertRaises(SystemExit):
+                        self.parse(argv)
@@ -1,3 +1,4 @@
+import random
 import unittest
 
 import sudoku
@@ -240,3 +241,143 @@ class SudokuTestCase(unittest.TestCase):
         solution = sudoku.solve(grid)
         solved = sudoku.check_solution(solution)
         self.assertTrue(solved)
+
+    def test_solve_engines(self):
+        puzzle = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+        grid = sudoku.group(list(puzzle), 9)
+        solution = sudoku.solve(grid, engine="bitmask")
+        self.assertTrue(sudoku.check_solution(solution))
+        self.assertTrue(all(p in (".", s) for p, s in zip(puzzle, sum(solution, []))))
+
+        unsolvable = sudoku.group(list("12345678." + "........9" + "." * 63), 9)
+        self.assertIsNone(sudoku.solve(unsolvable, engine="bitmask"))
+        with self.assertRaises(ValueError):
+            sudoku.solve(unsolvable, engine="magic")
+
+    def test_solve_dlx(self):
+        puzzle = "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97.."
+        solution = sudoku.solve(sudoku.group(list(puzzle), 9), engine="dlx")
+        self.assertTrue(sudoku.check_solution(solution))
+        self.assertEqual(solution, sudoku.solve(sudoku.group(list(puzzle), 9), engine="bitmask"))
+
+        conflicting = sudoku.group(list("11" + "." * 79), 9)
+        self.assertIsNone(sudoku.solve(conflicting, engine="dlx"))
+
+    def test_count_solutions(self):
+        puzzle = "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97.."
+        for engine in ("bitmask", "dlx"):
+            with self.subTest(engine=engine):
+                grid = sudoku.group(list(puzzle), 9)
+                self.assertEqual(1, sudoku.count_solutions(grid, engine=engine))
+                grid[0][2] = "."
+                grid[0][3] = "."
+                self.assertEqual(2, sudoku.count_solutions(grid, limit=2, engine=engine))
+
+    def test_solve_line(self):
+        puzzle = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+        expected = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+        self.assertEqual(expected, sudoku.solve_line(puzzle))
+        self.assertEqual(expected, sudoku.solve_line(puzzle.replace("0", "."), engine="dlx"))
+        self.assertEqual("", sudoku.solve_line("11" + "0" * 79, engine="dlx"))
+        self.assertEqual(expected, sudoku.solve_line(puzzle + " hard"))
+
+    def test_solve_line_rejects_malformed_lines(self):
+        puzzle = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+        for line in ["1234", "", puzzle + "1", puzzle[:-1] + "x", "0" * 256]:
+            with self.subTest(line=line):
+                self.assertEqual("", sudoku.solve_line(line))
+                with self.assertRaises(ValueError):
+                    sudoku.parse_line(line)
+
+    def test_flat_grid(self):
+        grid = sudoku.read_sudoku("puzzle1.txt")
+        flat = sudoku.to_flat(grid)
+        self.assertEqual(81, len(flat))
+        self.assertEqual(grid, sudoku.from_flat(flat))
+        for pos in [(0, 0), (0, 2), (4, 7), (8, 8)]:
+            with self.subTest(pos=pos):
+                digits = lambda values: [int(v) if v != "." else 0 for v in values]
+                self.assertEqual(digits(sudoku.get_row(grid, pos)), list(sudoku.get_row(flat, pos)))
+                self.assertEqual(digits(sudoku.get_col(grid, pos)), list(sudoku.get_col(flat, pos)))
+                self.assertEqual(
+                    digits(sudoku.get_block(grid, pos)), list(sudoku.get_block(flat, pos))
+                )
+                self.assertEqual(
+                    set(digits(sudoku.find_possible_values(grid, pos))),
+                    sudoku.find_possible_values(flat, pos),
+                )
+
+        self.assertFalse(sudoku.check_solution(flat))
+        solution = sudoku.to_flat(sudoku.solve(grid))
+        self.assertTrue(sudoku.check_solution(solution))
+        solution[0], solution[1] = solution[1], solution[0]
+        self.assertFalse(sudoku.check_solution(solution))
+
+    def test_generate_unique_sudoku(self):
+        grid = sudoku.generate_unique_sudoku(clues=25)
+        self.assertGreaterEqual(sum(1 for row in grid for e in row if e != "."), 25)
+        self.assertEqual(1, sudoku.count_solutions(grid, limit=2))
+        self.assertIn(sudoku.grade_difficulty(grid), sudoku.DIFFICULTIES)
+
+        line, difficulty = sudoku.generate_line(seed=42)
+        self.assertEqual((line, difficulty), sudoku.generate_line(seed=42))
+        self.assertEqual(1, sudoku.count_solutions(sudoku.parse_line(line), limit=2))
+
+    def test_generate_line_keeps_global_random_state(self):
+        state = random.getstate()
+        sudoku.generate_line(seed=7)
+        self.assertEqual(state, random.getstate())
+
+    def test_grade_difficulty(self):
+        self.assertEqual("easy", sudoku.grade_difficulty(sudoku.read_sudoku("puzzle1.txt")))
+        hard = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+        self.assertEqual("hard", sudoku.grade_difficulty(sudoku.parse_line(hard)))
+
+    def test_large_sizes(self):
+        for size in (4, 16, 25):
+            with self.subTest(size=size):
+                solution = sudoku.random_solution(size)
+                self.assertTrue(sudoku.check_solution(solution))
+                self.assertTrue(sudoku.check_solution(sudoku.to_flat(solution)))
+                grid = [
+                    ["." if (i * size + j) % 3 == 0 else value for j, value in enumerate(row)]
+                    for i, row in enumerate(solution)
+                ]
+                for engine in ("bitmask", "dlx"):
+                    self.assertTrue(sudoku.check_solution(sudoku.solve(grid, engine=engine)))
+                line = sudoku.format_line(grid)
+                self.assertEqual(size * size, len(line))
+                self.assertTrue(
+                    sudoku.check_solution(sudoku.parse_line(sudoku.solve_line(line, size=size), size))
+                )
+        self.assertRaises(ValueError, sudoku.get_layout, 10)
+
+    def test_solver_stats(self):
+        for engine in sudoku.ENGINES:
+            with self.subTest(engine=engine):
+                stats = sudoku.SolverStats()
+                solution = sudoku.solve(sudoku.read_sudoku("puzzle3.txt"), engine=engine, stats=stats)
+                self.assertTrue(sudoku.check_solution(solution))
+                self.assertGreater(stats.nodes, 0)
+                self.assertGreaterEqual(stats.nodes, stats.max_depth)
+                self.assertGreater(stats.elapsed, 0)
+        stats = sudoku.SolverStats()
+        sudoku.solve(sudoku.read_sudoku("puzzle1.txt"), engine="bitmask", stats=stats)
+        self.assertEqual((1, 0, 0, 51), (stats.nodes, stats.backtracks, stats.max_depth, stats.propagations))
+        total = sudoku.SolverStats(nodes=1, backtracks=2, max_depth=5, propagations=3, elapsed=1.0)
+        total += stats
+        self.assertEqual((2, 2, 5, 54), (total.nodes, total.backtracks, total.max_depth, total.propagations))
+
+    def test_check_solutions(self):
+        solutions = [sudoku.solve(sudoku.read_sudoku(f"puzzle{i}.txt")) for i in (1, 2, 3)]
+        array = sudoku.to_array(solutions * 2).copy()
+        array[3, 4, 4] = 0
+        array[4, 0, :] = array[4, 0, ::-1]
+        array[5, 8, 8] = 10
+        self.assertEqual(
+            [True, True, True, False, False, False], sudoku.check_solutions(array).tolist()
+        )
+        for grid, ok in zip(array, sudoku.check_solutions(array)):
+            self.assertEqual(ok, sudoku.check_solution(bytearray(grid.tobytes())))
+        large = sudoku.to_array([sudoku.random_solution(16)], size=16)
+        self.assertEqual([True], sudoku.check_solutions(large).tolist())
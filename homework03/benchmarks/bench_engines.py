@@ -0,0 +1,39 @@
+"""
+Время одного шага игры «Жизнь» разными движками.
+
+    $ python benchmarks/bench_engines.py
+    $ python benchmarks/bench_engines.py --engines numpy --size 4000 --steps 50
+
+Медленные движки (python) на больших полях лучше запускать с --steps 1.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from life import ENGINES  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Engines to compare.")
+    parser.add_argument("--size", type=int, default=1000, help="Side of the square board.")
+    parser.add_argument("--steps", type=int, default=10, help="Generations to run.")
+    args = parser.parse_args()
+
+    print(f"{'engine':<10}{'step':>14}{'cells/s':>16}")
+    for name in args.engines.split(","):
+        game = ENGINES[name]((args.size, args.size))
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            game.step()
+        elapsed = (time.perf_counter() - start) / args.steps
+        print(f"{name:<10}{elapsed * 1000:>12.2f}ms{args.size * args.size / elapsed:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
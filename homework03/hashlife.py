@@ -0,0 +1,288 @@
+import functools
+import pathlib
+import typing as tp
+
+from life import Cell, Grid
+from rle import read_rle, write_rle
+
+# Размер кэшей по умолчанию: при переполнении вытесняются давно не использованные записи
+DEFAULT_CACHE_SIZE = 1 << 20
+
+
+class Node:
+    """
+    Узел квадродерева: квадрат со стороной 2 ** level из четырех квадрантов.
+
+    Узлы создаются через HashLife.join, который возвращает уже существующий узел
+    с теми же квадрантами, поэтому узлы сравниваются и хешируются по id.
+    """
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+    level: int
+    population: int
+    nw: "Node"
+    ne: "Node"
+    sw: "Node"
+    se: "Node"
+
+    def __init__(self, level: int, children: tp.Sequence["Node"] = (), population: int = 0) -> None:
+        self.level = level
+        if children:
+            self.nw, self.ne, self.sw, self.se = children
+            population = sum(child.population for child in children)
+        self.population = population
+
+
+# Листья - клетки 1x1
+DEAD = Node(0)
+ALIVE = Node(0, population=1)
+
+
+class HashLife:
+    """
+    Игра «Жизнь» по алгоритму HashLife (Gosper, 1984).
+
+    Поле - квадродерево из канонических узлов, а для каждого узла запоминается
+    его центральная половина через 2 ** j поколений. Одинаковые участки поля и
+    повторяющиеся моменты времени считаются один раз, поэтому step_many продвигает
+    периодичные и регулярно растущие узоры на миллионы поколений за секунды.
+
+    В отличие от GameOfLife поле не ограничено: клетки, вышедшие за пределы
+    исходной сетки, продолжают жить. Координаты отсчитываются от левого верхнего
+    угла исходной сетки и могут быть отрицательными.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        # Кэши у каждой игры свои, lru_cache сам вытесняет старые записи. Узел,
+        # вытесненный из кэша join, может появиться еще раз другим объектом: это
+        # лишь повторная работа, результаты остаются верными.
+        self.join = functools.lru_cache(maxsize=cache_size)(self._join)
+        self.successor = functools.lru_cache(maxsize=cache_size)(self._successor)
+        self.empty = functools.lru_cache(maxsize=None)(self._empty)
+        self.root = self.empty(3)
+        # Координаты левого верхнего угла корня
+        self.top = self.left = 0
+        self.generations = 1
+
+    @staticmethod
+    def _join(nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        return Node(nw.level + 1, (nw, ne, sw, se))
+
+    def _empty(self, level: int) -> Node:
+        if level == 0:
+            return DEAD
+        child = self.empty(level - 1)
+        return self.join(child, child, child, child)
+
+    def centre(self, node: Node) -> Node:
+        """
+        Вдвое больший узел, в центре которого стоит node.
+        """
+        empty = self.empty(node.level - 1)
+        return self.join(
+            self.join(empty, empty, empty, node.nw),
+            self.join(empty, empty, node.ne, empty),
+            self.join(empty, node.sw, empty, empty),
+            self.join(node.se, empty, empty, empty),
+        )
+
+    def _life_4x4(self, node: Node) -> Node:
+        # Центр 2x2 квадрата 4x4 через одно поколение
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        cells = [
+            [nw.nw, nw.ne, ne.nw, ne.ne],
+            [nw.sw, nw.se, ne.sw, ne.se],
+            [sw.nw, sw.ne, se.nw, se.ne],
+            [sw.sw, sw.se, se.sw, se.se],
+        ]
+        result = []
+        for i in (1, 2):
+            for j in (1, 2):
+                total = sum(
+                    cells[x][y].population for x in range(i - 1, i + 2) for y in range(j - 1, j + 2)
+                )
+                alive = cells[i][j].population
+                result.append(ALIVE if total == 3 or (total == 4 and alive) else DEAD)
+        return self.join(*result)
+
+    def _successor(self, node: Node, j: int) -> Node:
+        """
+        Центральная половина узла через 2 ** j поколений. Больше чем на
+        2 ** (node.level - 2) поколений узел продвинуть нельзя, такое j уменьшается.
+        """
+        if node.population == 0:
+            return node.nw
+        j = min(j, node.level - 2)
+        if node.level == 2:
+            return self._life_4x4(node)
+        join, successor = self.join, self.successor
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        # Девять перекрывающихся квадратов со стороной в половину узла
+        squares = [
+            nw,
+            join(nw.ne, ne.nw, nw.se, ne.sw),
+            ne,
+            join(nw.sw, nw.se, sw.nw, sw.ne),
+            join(nw.se, ne.sw, sw.ne, se.nw),
+            join(ne.sw, ne.se, se.nw, se.ne),
+            sw,
+            join(sw.ne, se.nw, sw.se, se.sw),
+            se,
+        ]
+        c1, c2, c3, c4, c5, c6, c7, c8, c9 = [successor(square, j) for square in squares]
+        if j < node.level - 2:
+            # Девяти квадратов, продвинутых на 2 ** j поколений, уже достаточно
+            return join(
+                join(c1.se, c2.sw, c4.ne, c5.nw),
+                join(c2.se, c3.sw, c5.ne, c6.nw),
+                join(c4.se, c5.sw, c7.ne, c8.nw),
+                join(c5.se, c6.sw, c8.ne, c9.nw),
+            )
+        # Иначе первый шаг продвинул квадраты на 2 ** (level - 3) поколений, а второй
+        # продвигает их центры еще на столько же
+        return join(
+            successor(join(c1, c2, c4, c5), j),
+            successor(join(c2, c3, c5, c6), j),
+            successor(join(c4, c5, c7, c8), j),
+            successor(join(c5, c6, c8, c9), j),
+        )
+
+    def _is_padded(self, node: Node) -> bool:
+        # Все живые клетки лежат в центральном квадрате со стороной в четверть узла
+        return (
+            node.nw.population == node.nw.se.se.population
+            and node.ne.population == node.ne.sw.sw.population
+            and node.sw.population == node.sw.ne.ne.population
+            and node.se.population == node.se.nw.nw.population
+        )
+
+    def _expand(self) -> None:
+        size = 1 << self.root.level
+        self.root = self.centre(self.root)
+        self.top -= size // 2
+        self.left -= size // 2
+
+    def step_many(self, n: int) -> None:
+        """
+        Продвинуть игру на n поколений.
+
+        n раскладывается на степени двойки, и для каждой корень продвигается
+        одним вызовом successor.
+        """
+        j = 0
+        while n:
+            if n & 1:
+                # Узор должен остаться в центральной половине корня, которую
+                # возвращает successor: он лежит в центральной четверти и уходит
+                # не дальше чем на 2 ** j <= сторона / 8 клеток
+                while self.root.level < j + 3 or not self._is_padded(self.root):
+                    self._expand()
+                quarter = 1 << (self.root.level - 2)
+                self.root = self.successor(self.root, j)
+                self.top += quarter
+                self.left += quarter
+                self.generations += 1 << j
+            n >>= 1
+            j += 1
+
+    def step(self) -> None:
+        self.step_many(1)
+
+    @property
+    def population(self) -> int:
+        return self.root.population
+
+    def _build(self, cells: tp.List[Cell], level: int, top: int, left: int) -> Node:
+        # Узел уровня level с левым верхним углом (top, left) из списка живых клеток в нем
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return ALIVE
+        half = 1 << (level - 1)
+        quadrants: tp.List[tp.List[Cell]] = [[], [], [], []]
+        for i, j in cells:
+            quadrants[(i >= top + half) * 2 + (j >= left + half)].append((i, j))
+        return self.join(
+            self._build(quadrants[0], level - 1, top, left),
+            self._build(quadrants[1], level - 1, top, left + half),
+            self._build(quadrants[2], level - 1, top + half, left),
+            self._build(quadrants[3], level - 1, top + half, left + half),
+        )
+
+    def set_cells(self, cells: tp.Iterable[Cell]) -> None:
+        """
+        Сделать живыми ровно клетки cells, счетчик поколений сбрасывается.
+        """
+        cells = list(cells)
+        top = min((i for i, _ in cells), default=0)
+        left = min((j for _, j in cells), default=0)
+        extent = max([i - top + 1 for i, _ in cells] + [j - left + 1 for _, j in cells] + [8])
+        level = max(3, (extent - 1).bit_length())
+        self.root = self._build(cells, level, top, left)
+        self.top, self.left = top, left
+        self.generations = 1
+
+    def cells(self, window: tp.Optional[tp.Tuple[int, int, int, int]] = None) -> tp.Iterator[Cell]:
+        """
+        Живые клетки, window = (top, left, rows, cols) ограничивает область поиска.
+        """
+        stack = [(self.root, self.top, self.left)]
+        while stack:
+            node, top, left = stack.pop()
+            if node.population == 0:
+                continue
+            size = 1 << node.level
+            if window is not None:
+                wtop, wleft, rows, cols = window
+                if top >= wtop + rows or left >= wleft + cols:
+                    continue
+                if top + size <= wtop or left + size <= wleft:
+                    continue
+            if node.level == 0:
+                yield top, left
+                continue
+            half = size // 2
+            stack.append((node.se, top + half, left + half))
+            stack.append((node.sw, top + half, left))
+            stack.append((node.ne, top, left + half))
+            stack.append((node.nw, top, left))
+
+    def set_grid(self, grid: Grid) -> None:
+        self.set_cells((i, j) for i, row in enumerate(grid) for j, value in enumerate(row) if value)
+
+    def get_grid(self, rows: int, cols: int, top: int = 0, left: int = 0) -> Grid:
+        """
+        Клетки в прямоугольнике rows x cols с левым верхним углом (top, left).
+        """
+        grid = [[0] * cols for _ in range(rows)]
+        for i, j in self.cells((top, left, rows, cols)):
+            grid[i - top][j - left] = 1
+        return grid
+
+    @classmethod
+    def from_file(cls, filename: pathlib.Path, cache_size: int = DEFAULT_CACHE_SIZE) -> "HashLife":
+        """
+        Прочитать клетки из файла в формате RLE (.rle) или GameOfLife.save.
+        """
+        game = cls(cache_size)
+        if pathlib.Path(filename).suffix.lower() == ".rle":
+            game.set_cells(read_rle(filename)[2])
+            return game
+        with open(filename) as f:
+            grid = [[int(value) for value in line.strip()] for line in f if line.strip()]
+        game.set_grid(grid)
+        return game
+
+    def save(
+        self, filename: pathlib.Path, rows: int, cols: int, top: int = 0, left: int = 0
+    ) -> None:
+        """
+        Сохранить прямоугольник rows x cols в формате RLE (.rle) или GameOfLife.save.
+        """
+        if pathlib.Path(filename).suffix.lower() == ".rle":
+            cells = [(i - top, j - left) for i, j in self.cells((top, left, rows, cols))]
+            write_rle(filename, rows, cols, cells)
+            return
+        grid = self.get_grid(rows, cols, top, left)
+        with open(filename, "w") as f:
+            f.write("\n".join("".join(str(value) for value in row) for row in grid))
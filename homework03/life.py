@@ -1,21 +1,61 @@
+import os
 import pathlib
 import random
 import typing as tp
+import weakref
+from multiprocessing import Pool, shared_memory
 
+import numpy as np
 import pygame
 from pygame.locals import *
 
+from rle import read_rle, write_rle
+
 Cell = tp.Tuple[int, int]
 Cells = tp.List[int]
 Grid = tp.List[Cells]
 
+# Сколько байтов различий строк BitGameOfLife хеширует за раз
+HASH_CHUNK_BYTES = 1 << 18
+
+MASK64 = (1 << 64) - 1
+
+
+def zobrist_key(index: int) -> int:
+    """
+    Случайный 64-битный ключ клетки с номером index = i * cols + j.
+
+    Вместо таблицы случайных чисел размером с поле ключ считается перемешиванием
+    номера (финализатор splitmix64): для поля 10000x10000 таблица заняла бы 800 Мб.
+    """
+    z = (index + 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def zobrist_keys(indices: np.ndarray) -> np.ndarray:
+    """
+    То же, что zobrist_key, сразу для массива номеров клеток.
+    """
+    z = indices.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
 
 class GameOfLife:
+    # Сколько последних поколений помнит history: циклы с большим периодом
+    # не обнаруживаются, а 0 выключает поиск циклов. Быстрые движки по умолчанию
+    # его не ведут: хеширование изменившихся клеток стоит им дороже самого шага.
+    history_size = 1024
+
     def __init__(
         self,
         size: tp.Tuple[int, int],
         randomize: bool = True,
         max_generations: tp.Optional[float] = float("inf"),
+        history_size: tp.Optional[int] = None,
     ) -> None:
         # Размер клеточного поля
         self.rows, self.cols = size
@@ -27,6 +67,16 @@ class GameOfLife:
         self.max_generations = max_generations
         # Текущее число поколений
         self.generations = 1
+        # Хеш Зобриста текущего поколения (XOR ключей живых клеток) и поколение,
+        # для которого он посчитан
+        self.hash = 0
+        self._hashed_generation: tp.Any = None
+        # Номера недавних поколений по их хешам
+        self.history: tp.Dict[int, int] = {}
+        # Период цикла, в который вошла игра (1 - устойчивая фигура), или None
+        self.period: tp.Optional[int] = None
+        if history_size is not None:
+            self.history_size = history_size
 
     def create_grid(self, randomize: bool = False) -> Grid:
         """
@@ -102,6 +152,38 @@ class GameOfLife:
         self.prev_generation = self.curr_generation
         self.curr_generation = self.get_next_generation()
         self.generations += 1
+        if self.history_size:
+            self._update_hash()
+        else:
+            # Хеш не обновлялся: при включении поиска циклов он посчитается заново
+            self._hashed_generation = None
+
+    def _update_hash(self) -> None:
+        if self._hashed_generation is not self.prev_generation:
+            # Поколение задано снаружи: хеш считается заново, история забывается
+            self.hash = self._flips_hash(self.create_grid(), self.prev_generation)
+            self.history = {self.hash: self.generations - 1}
+            self.period = None
+        # Хеш меняется только на ключи изменившихся клеток
+        self.hash ^= self._flips_hash(self.prev_generation, self.curr_generation)
+        self._hashed_generation = self.curr_generation
+        if self.hash in self.history:
+            self.period = self.generations - self.history.pop(self.hash)
+        self.history[self.hash] = self.generations
+        if len(self.history) > self.history_size:
+            del self.history[next(iter(self.history))]
+
+    def _flips_hash(self, prev: Grid, curr: Grid) -> int:
+        """
+        XOR ключей клеток, которые различаются в поколениях prev и curr.
+        """
+        result = 0
+        for i, (old, new) in enumerate(zip(prev, curr)):
+            if old != new:
+                for j, (a, b) in enumerate(zip(old, new)):
+                    if a != b:
+                        result ^= zobrist_key(i * self.cols + j)
+        return result
 
     @property
     def is_max_generations_exceeded(self) -> bool:
@@ -113,39 +195,453 @@ class GameOfLife:
     @property
     def is_changing(self) -> bool:
         """
-        Изменилось ли состояние клеток с предыдущего шага.
+        Не повторилось ли текущее поколение.
+
+        Поколения сравниваются по хешам с последними history_size поколениями,
+        поэтому игра останавливается на первом же цикле любого периода.
+        Совпадение хешей разных поколений возможно, но вероятность его 2 ** -64.
+        Если поиск циклов выключен, поколение сравнивается только с предыдущим.
         """
+        if self.history_size:
+            return self.period is None
         return self.prev_generation != self.curr_generation
 
-    @staticmethod
-    def from_file(filename: pathlib.Path) -> "GameOfLife":
+    def get_grid(self) -> Grid:
+        """
+        Текущее поколение в виде матрицы из 0 и 1, независимо от того,
+        как его хранит движок.
+        """
+        # Копия: поколение, измененное на месте, а не через set_grid, сохранило
+        # бы старый хеш
+        return [row[:] for row in self.curr_generation]
+
+    def set_grid(self, grid: Grid) -> None:
+        """
+        Сделать матрицу из 0 и 1 текущим поколением.
+        """
+        self.curr_generation = grid
+
+    def get_cells(self) -> tp.List[Cell]:
+        """
+        Живые клетки текущего поколения.
+        """
+        return [
+            (i, j) for i, row in enumerate(self.get_grid()) for j, value in enumerate(row) if value
+        ]
+
+    def set_cells(self, cells: tp.Iterable[Cell]) -> None:
+        """
+        Сделать живыми ровно клетки cells.
+        """
+        grid = [[0] * self.cols for _ in range(self.rows)]
+        for i, j in cells:
+            grid[i][j] = 1
+        self.set_grid(grid)
+
+    @classmethod
+    def from_file(cls, filename: pathlib.Path) -> "GameOfLife":
         """
         Прочитать состояние клеток из указанного файла.
+
+        Файлы с расширением .rle читаются в формате RLE, остальные - как строки из
+        0 и 1, по символу на клетку.
         """
-        f = open(filename, "r")
-        grid = [[int(num) for num in line.strip()] for line in f]
-        f.close()
-        game_of_life = GameOfLife((len(grid), len(grid[0])))
-        game_of_life.curr_generation = grid
+        if pathlib.Path(filename).suffix.lower() == ".rle":
+            rows, cols, cells = read_rle(filename)
+            game_of_life = cls((rows, cols), randomize=False)
+            game_of_life.set_cells(cells)
+            return game_of_life
+        with open(filename) as f:
+            grid = [[int(num) for num in line.strip()] for line in f if line.strip()]
+        game_of_life = cls((len(grid), len(grid[0])), randomize=False)
+        game_of_life.set_grid(grid)
         return game_of_life
 
     def save(self, filename: pathlib.Path) -> None:
         """
-        Сохранить текущее состояние клеток в указанный файл.
-        """
-        f = open(filename, "w")
-        f.write(
-            "\n".join(
-                [
-                    "".join(
-                        str(line)
-                        .strip("]")
-                        .strip("[")
-                        .replace(" ", "")
-                        .replace(",", "")
-                    )
-                    for line in self.curr_generation
-                ]
-            )
+        Сохранить текущее состояние клеток в указанный файл, в формате RLE,
+        если у файла расширение .rle.
+        """
+        if pathlib.Path(filename).suffix.lower() == ".rle":
+            write_rle(filename, self.rows, self.cols, self.get_cells())
+            return
+        with open(filename, "w") as f:
+            f.write("\n".join("".join(str(value) for value in row) for row in self.get_grid()))
+
+
+def next_generation(padded: np.ndarray) -> np.ndarray:
+    """
+    Следующее поколение клеток массива padded без его рамки шириной в одну клетку.
+    """
+    # Сумма квадрата 3x3 вокруг каждой клетки, включая ее саму: сначала по
+    # вертикали, потом по горизонтали
+    columns = padded[:-2] + padded[1:-1] + padded[2:]
+    total = columns[:, :-2] + columns[:, 1:-1] + columns[:, 2:]
+    # Клетка жива, если у нее 3 соседа (total == 3) или она жива и у нее
+    # 2 или 3 соседа (total == 3 или 4)
+    return ((total == 3) | ((total == 4) & (padded[1:-1, 1:-1] == 1))).view(np.uint8)
+
+
+class NumpyGameOfLife(GameOfLife):
+    """
+    Игра, в которой поколение хранится в массиве NumPy из uint8.
+
+    Число соседей считается не по клеткам, а сразу для всего поля суммами
+    сдвинутых копий массива, поэтому шаг на поле 1000x1000 занимает миллисекунды.
+    """
+
+    curr_generation: np.ndarray  # type: ignore
+    prev_generation: np.ndarray  # type: ignore
+    history_size = 0
+
+    def create_grid(self, randomize: bool = False) -> np.ndarray:  # type: ignore
+        if randomize:
+            return np.random.randint(0, 2, size=(self.rows, self.cols), dtype=np.uint8)
+        return np.zeros((self.rows, self.cols), dtype=np.uint8)
+
+    def get_next_generation(self) -> np.ndarray:  # type: ignore
+        # Поле окружено мертвыми клетками, чтобы у крайних клеток тоже было восемь соседей
+        return next_generation(np.pad(self.curr_generation, 1))
+
+    @property
+    def is_changing(self) -> bool:
+        if self.history_size:
+            return self.period is None
+        return not np.array_equal(self.prev_generation, self.curr_generation)
+
+    def _flips_hash(self, prev: np.ndarray, curr: np.ndarray) -> int:  # type: ignore
+        flips = np.flatnonzero(prev != curr)
+        return int(np.bitwise_xor.reduce(zobrist_keys(flips), initial=np.uint64(0)))
+
+    def get_grid(self) -> Grid:
+        return self.curr_generation.tolist()
+
+    def set_grid(self, grid: Grid) -> None:
+        self.curr_generation = np.array(grid, dtype=np.uint8)
+
+    def get_cells(self) -> tp.List[Cell]:
+        rows, cols = np.nonzero(self.curr_generation)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def set_cells(self, cells: tp.Iterable[Cell]) -> None:
+        grid = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        indices = np.array(list(cells), dtype=np.intp).reshape(-1, 2)
+        grid[indices[:, 0], indices[:, 1]] = 1
+        self.curr_generation = grid
+
+
+class BitGameOfLife(GameOfLife):
+    """
+    Игра, в которой каждая строка поля упакована в целое число: бит j - клетка
+    в столбце j. Поле 10000x10000 занимает около 12 Мб.
+
+    Следующее поколение считается сразу для всей строки битовыми операциями:
+    три соседние строки складываются столбиком сумматорами, а затем
+    суммы соседних столбцов - со сдвигами на один бит.
+    """
+
+    curr_generation: tp.List[int]  # type: ignore
+    prev_generation: tp.List[int]  # type: ignore
+    history_size = 0
+
+    def create_grid(self, randomize: bool = False) -> tp.List[int]:  # type: ignore
+        if randomize:
+            return [random.getrandbits(self.cols) for _ in range(self.rows)]
+        return [0] * self.rows
+
+    def get_neighbours(self, cell: Cell) -> Cells:
+        x, y = cell
+        return [
+            self.curr_generation[i] >> j & 1
+            for i in range(max(x - 1, 0), min(x + 2, self.rows))
+            for j in range(max(y - 1, 0), min(y + 2, self.cols))
+            if (i, j) != (x, y)
+        ]
+
+    def get_next_generation(self) -> tp.List[int]:  # type: ignore
+        mask = (1 << self.cols) - 1
+        rows = [0] + self.curr_generation + [0]
+        new_grid = []
+        for i in range(1, self.rows + 1):
+            above, row, below = rows[i - 1], rows[i], rows[i + 1]
+            # Сколько живых клеток в столбце из трех клеток: двухбитное число high:low
+            low = above ^ row ^ below
+            high = (above & row) | (below & (above ^ row))
+            # Складываем столбцы j - 1, j и j + 1. Младшие биты дают бит odd суммы
+            # и перенос carry, а старшие биты и перенос - число двоек (от 0 до 4)
+            left_low, right_low = low << 1, low >> 1
+            odd = left_low ^ low ^ right_low
+            carry = (left_low & low) | (right_low & (left_low ^ low))
+            left_high, right_high = high << 1, high >> 1
+            pair1, pair1_carry = left_high ^ high, left_high & high
+            pair2, pair2_carry = right_high ^ carry, right_high & carry
+            twos_odd = pair1 ^ pair2
+            both = pair1 & pair2
+            # Сумма квадрата равна odd + 2 * twos_odd + 4 * fours + 8 * eights, где
+            # eights означает, что сумма не меньше 8
+            fours = pair1_carry ^ pair2_carry ^ both
+            eights = (pair1_carry & pair2_carry) | (both & (pair1_carry | pair2_carry))
+            # Сумма квадрата 3x3 с самой клеткой: 3 - рождение или выживание,
+            # 4 - выживание живой клетки
+            three = odd & twos_odd & ~fours & ~eights
+            four = ~odd & ~twos_odd & fours & ~eights & row
+            new_grid.append((three | four) & mask)
+        return new_grid
+
+    def _flips_hash(self, prev: tp.List[int], curr: tp.List[int]) -> int:  # type: ignore
+        nbytes = (self.cols + 7) // 8
+        rows = [i for i, (old, new) in enumerate(zip(prev, curr)) if old != new]
+        result = np.uint64(0)
+        # Различия строк обрабатываются порциями не больше HASH_CHUNK_BYTES, и в биты
+        # распаковываются только ненулевые байты, поэтому память не растет с полем
+        chunk = max(1, HASH_CHUNK_BYTES // nbytes)
+        for start in range(0, len(rows), chunk):
+            part = rows[start : start + chunk]
+            data = b"".join((prev[i] ^ curr[i]).to_bytes(nbytes, "little") for i in part)
+            diff = np.frombuffer(data, dtype=np.uint8)
+            positions = np.flatnonzero(diff)
+            bits = np.unpackbits(diff[positions, None], axis=1, bitorder="little")
+            byte_index, bit = np.nonzero(bits.view(np.bool_))
+            flip_rows, flip_cols = np.divmod(positions[byte_index] * 8 + bit, nbytes * 8)
+            flips = np.array(part, dtype=np.int64)[flip_rows] * self.cols + flip_cols
+            result ^= np.bitwise_xor.reduce(zobrist_keys(flips), initial=np.uint64(0))
+        return int(result)
+
+    def get_grid(self) -> Grid:
+        return [[row >> j & 1 for j in range(self.cols)] for row in self.curr_generation]
+
+    def set_grid(self, grid: Grid) -> None:
+        self.curr_generation = [
+            int("".join(str(value) for value in reversed(row)), 2) for row in grid
+        ]
+
+    def get_cells(self) -> tp.List[Cell]:
+        # bin(row)[:1:-1] - биты строки от столбца 0, без префикса 0b
+        return [
+            (i, j)
+            for i, row in enumerate(self.curr_generation)
+            for j, bit in enumerate(bin(row)[:1:-1])
+            if bit == "1"
+        ]
+
+    def set_cells(self, cells: tp.Iterable[Cell]) -> None:
+        grid = [0] * self.rows
+        for i, j in cells:
+            grid[i] |= 1 << j
+        self.curr_generation = grid
+
+
+# Сдвиги к клетке и ее восьми соседям
+AREA = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+class SparseGameOfLife(GameOfLife):
+    """
+    Игра, которая хранит только множество живых клеток.
+
+    Клетка может измениться, только если изменился кто-то из ее соседей или она
+    сама, поэтому на каждом шаге пересчитываются лишь клетки рядом с теми, что
+    изменились на предыдущем шаге. Шаг стоит пропорционально числу изменений,
+    а не площади поля.
+    """
+
+    curr_generation: tp.FrozenSet[Cell]  # type: ignore
+    prev_generation: tp.FrozenSet[Cell]  # type: ignore
+    # Поколение, посчитанное последним вызовом get_next_generation, поколение, из
+    # которого оно посчитано, и клетки, которые в нем изменились. Если текущее
+    # поколение задано снаружи, пересчитываются окрестности всех живых клеток.
+    _last_generation: tp.Optional[tp.FrozenSet[Cell]] = None
+    _last_source: tp.Optional[tp.FrozenSet[Cell]] = None
+    _changed: tp.FrozenSet[Cell] = frozenset()
+
+    def create_grid(self, randomize: bool = False) -> tp.FrozenSet[Cell]:  # type: ignore
+        if not randomize:
+            return frozenset()
+        return frozenset(
+            (i, j) for i in range(self.rows) for j in range(self.cols) if random.getrandbits(1)
+        )
+
+    def get_neighbours(self, cell: Cell) -> Cells:
+        x, y = cell
+        return [
+            int((i, j) in self.curr_generation)
+            for i in range(max(x - 1, 0), min(x + 2, self.rows))
+            for j in range(max(y - 1, 0), min(y + 2, self.cols))
+            if (i, j) != cell
+        ]
+
+    def get_next_generation(self) -> tp.FrozenSet[Cell]:  # type: ignore
+        alive = self.curr_generation
+        changed = self._changed if alive is self._last_generation else alive
+        candidates = {(x + dx, y + dy) for x, y in changed for dx, dy in AREA}
+        flips = []
+        for x, y in candidates:
+            # Клеток за пределами поля нет в alive, поэтому границы проверяются только
+            # у рождающихся клеток. count включает саму клетку.
+            count = 0
+            for dx, dy in AREA:
+                if (x + dx, y + dy) in alive:
+                    count += 1
+            if (x, y) in alive:
+                if count != 3 and count != 4:
+                    flips.append((x, y))
+            elif count == 3 and 0 <= x < self.rows and 0 <= y < self.cols:
+                flips.append((x, y))
+        new_generation = alive.symmetric_difference(flips)
+        self._last_generation, self._changed = new_generation, frozenset(flips)
+        self._last_source = alive
+        return new_generation
+
+    def _flips_hash(  # type: ignore
+        self, prev: tp.FrozenSet[Cell], curr: tp.FrozenSet[Cell]
+    ) -> int:
+        if prev is self._last_source and curr is self._last_generation:
+            flips = self._changed
+        else:
+            flips = prev.symmetric_difference(curr)
+        result = 0
+        for i, j in flips:
+            result ^= zobrist_key(i * self.cols + j)
+        return result
+
+    def get_grid(self) -> Grid:
+        grid = [[0] * self.cols for _ in range(self.rows)]
+        for i, j in self.curr_generation:
+            grid[i][j] = 1
+        return grid
+
+    def set_grid(self, grid: Grid) -> None:
+        self.curr_generation = frozenset(
+            (i, j) for i, row in enumerate(grid) for j, value in enumerate(row) if value
+        )
+
+    def get_cells(self) -> tp.List[Cell]:
+        return sorted(self.curr_generation)
+
+    def set_cells(self, cells: tp.Iterable[Cell]) -> None:
+        self.curr_generation = frozenset(cells)
+
+
+# Буферы поколений в процессе-работнике ParallelGameOfLife
+_worker_buffers: tp.List[np.ndarray] = []
+
+
+def _attach_buffers(names: tp.List[str], shape: tp.Tuple[int, int]) -> None:
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    # Ссылка на блоки нужна, пока живы массивы поверх них
+    _worker_buffers[:] = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in blocks]
+    _attach_buffers.blocks = blocks  # type: ignore
+
+
+def _step_strip(task: tp.Tuple[int, int, int]) -> None:
+    # Посчитать строки start..end буфера 1 - src по буферу src
+    start, end, src = task
+    grid, out = _worker_buffers[src], _worker_buffers[1 - src]
+    # Соседние строки полосы (halo) читаются прямо из общего буфера, за краем поля - нули
+    top, bottom = max(start - 1, 0), min(end + 1, len(grid))
+    padded = np.pad(grid[top:bottom], ((1 - (start - top), 1 - (bottom - end)), (1, 1)))
+    out[start:end] = next_generation(padded)
+
+
+def _release(pool: tp.Any, blocks: tp.List[shared_memory.SharedMemory]) -> None:
+    pool.terminate()
+    pool.join()
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+class ParallelGameOfLife(NumpyGameOfLife):
+    """
+    Игра, в которой поле делится на горизонтальные полосы, а полосы считают
+    несколько процессов.
+
+    Два поколения лежат в двух блоках multiprocessing.shared_memory: процессы
+    читают текущее поколение из одного блока, включая соседние строки своей
+    полосы, и пишут следующее в другой, а затем блоки меняются ролями. Поле
+    между процессами не копируется, каждому передаются только номера строк.
+
+    Процессы и общая память освобождаются методом close, при выходе из with или
+    при удалении игры.
+    """
+
+    def __init__(
+        self,
+        size: tp.Tuple[int, int],
+        randomize: bool = True,
+        max_generations: tp.Optional[float] = float("inf"),
+        history_size: tp.Optional[int] = None,
+        workers: tp.Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            size, randomize=randomize, max_generations=max_generations, history_size=history_size
         )
-        f.close()
+        self.workers = workers or os.cpu_count() or 1
+        nbytes = max(self.rows * self.cols, 1)
+        blocks = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(2)]
+        self._buffers = [
+            np.ndarray((self.rows, self.cols), dtype=np.uint8, buffer=block.buf) for block in blocks
+        ]
+        self._buffers[0][:] = self.prev_generation
+        self._buffers[1][:] = self.curr_generation
+        self.prev_generation, self.curr_generation = self._buffers
+        pool = Pool(
+            self.workers,
+            initializer=_attach_buffers,
+            initargs=([block.name for block in blocks], (self.rows, self.cols)),
+        )
+        self._pool = pool
+        bounds = np.linspace(0, self.rows, min(self.workers, self.rows) + 1).astype(int)
+        self._strips = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self._finalizer = weakref.finalize(self, _release, pool, blocks)
+
+    def _current_buffer(self) -> int:
+        for i, buffer in enumerate(self._buffers):
+            if self.curr_generation is buffer:
+                return i
+        # Поколение задано снаружи (set_grid, интерфейс): копируем его в буфер,
+        # который не занят предыдущим поколением
+        i = 1 if self.prev_generation is self._buffers[0] else 0
+        self._buffers[i][:] = self.curr_generation
+        self.curr_generation = self._buffers[i]
+        return i
+
+    def get_next_generation(self) -> np.ndarray:  # type: ignore
+        """
+        Следующее поколение пишется в буфер, где лежало поколение перед текущим.
+        """
+        if not self._finalizer.alive:
+            raise ValueError("ParallelGameOfLife is closed")
+        src = self._current_buffer()
+        self._pool.map(_step_strip, [(start, end, src) for start, end in self._strips])
+        return self._buffers[1 - src]
+
+    def close(self) -> None:
+        """
+        Остановить процессы и освободить общую память.
+
+        Поколения перед этим копируются из общей памяти, поэтому закрытую игру
+        можно читать и сохранять, но не продолжать.
+        """
+        if self._finalizer.alive:
+            self.prev_generation = np.array(self.prev_generation, copy=True)
+            self.curr_generation = np.array(self.curr_generation, copy=True)
+            self._buffers = []
+            self._hashed_generation = None
+        self._finalizer()
+
+    def __enter__(self) -> "ParallelGameOfLife":
+        return self
+
+    def __exit__(self, *args: tp.Any) -> None:
+        self.close()
+
+
+# Движки по имени для --engine в интерфейсах
+ENGINES: tp.Dict[str, tp.Type[GameOfLife]] = {
+    "python": GameOfLife,
+    "numpy": NumpyGameOfLife,
+    "bits": BitGameOfLife,
+    "sparse": SparseGameOfLife,
+    "parallel": ParallelGameOfLife,
+}
@@ -1,7 +1,7 @@
 import argparse
 import curses
 
-from life import GameOfLife
+from life import ENGINES, GameOfLife
 from ui import UI
 
 
@@ -15,9 +15,10 @@ class Console(UI):
 
     def draw_grid(self, screen) -> None:
         """ Отобразить состояние клеток. """
+        grid = self.life.get_grid()
         for i in range(1, self.life.rows + 1):
             for j in range(1, self.life.cols + 1):
-                symbol = str(self.life.curr_generation[i - 1][j - 1])
+                symbol = str(grid[i - 1][j - 1])
                 screen.addstr(i, j, "*") if symbol == "1" else screen.addstr(i, j, " ")
 
     def run(self) -> None:
@@ -57,7 +58,15 @@ if __name__ == "__main__":
         default=100,
         help="Number of max generations",
     )
+    parser.add_argument(
+        "--engine",
+        action="store",
+        dest="engine",
+        choices=list(ENGINES),
+        default="python",
+        help="Engine that computes generations",
+    )
     args = parser.parse_args()
-    life = GameOfLife((args.rows, args.cols), max_generations=args.max_generations)
+    life = ENGINES[args.engine]((args.rows, args.cols), max_generations=args.max_generations)
     ui = Console(life)
     ui.run()
@@ -1,12 +1,18 @@
 import argparse
+import typing as tp
 
 import pygame
 from pygame.locals import *
 
-from life import GameOfLife
+from life import ENGINES, Cell, GameOfLife
 from ui import UI
 
 
+# Если изменилось больше клеток, экран обновляется целиком: display.update
+# со множеством прямоугольников медленнее, чем display.flip
+MAX_DIRTY_RECTS = 2000
+
+
 class GUI(UI):
     def __init__(self, life: GameOfLife, cell_size: int = 10, speed: int = 10) -> None:
         super().__init__(life)
@@ -23,41 +29,52 @@ class GUI(UI):
         # Скорость протекания игры
         self.speed = speed
 
-    def draw_lines(self) -> None:
+        # Пустое поле с сеткой и живая клетка с линиями сетки рисуются один раз,
+        # а затем клетки только копируются из них
+        self.background = pygame.Surface(self.screen_size)
+        self.background.fill(pygame.Color("white"))
+        self.draw_lines(self.background)
+        self.alive_cell = pygame.Surface((cell_size, cell_size))
+        self.alive_cell.fill(pygame.Color(127, 242, 26))
+        self.alive_cell.blit(self.background, (0, 0), (0, 0, cell_size, cell_size), BLEND_MIN)
+        # Живые клетки, которые сейчас на экране
+        self.shown: tp.Set[Cell] = set()
+
+    def draw_lines(self, surface: pygame.Surface) -> None:
         """ Отрисовать сетку """
         for x in range(0, self.width, self.cell_size):
-            pygame.draw.line(
-                self.screen, pygame.Color("black"), (x, 0), (x, self.height)
-            )
+            pygame.draw.line(surface, pygame.Color("black"), (x, 0), (x, self.height))
         for y in range(0, self.height, self.cell_size):
-            pygame.draw.line(
-                self.screen, pygame.Color("black"), (0, y), (self.width, y)
-            )
+            pygame.draw.line(surface, pygame.Color("black"), (0, y), (self.width, y))
 
-    def draw_grid(self) -> None:
+    def draw_grid(self) -> tp.List[pygame.Rect]:
         """
-        Отрисовка списка клеток с закрашиванием их в соответствующе цвета.
+        Перерисовать клетки, которые изменились с прошлого кадра, и вернуть их
+        прямоугольники.
         """
-        for x in range(0, self.width, self.cell_size):
-            for y in range(0, self.height, self.cell_size):
-                color = (255, 255, 255)  # white color
-                if (
-                    self.life.curr_generation[y // self.cell_size][x // self.cell_size]
-                    == 1
-                ):
-                    color = (127, 242, 26)  # green color
-                pygame.draw.rect(
-                    self.screen,
-                    pygame.Color(color),
-                    (x, y, self.cell_size, self.cell_size),
-                )
+        alive = set(self.life.get_cells())
+        size = self.cell_size
+        rects = []
+        blits: tp.List[tp.Tuple[tp.Any, ...]] = []
+        for i, j in alive.symmetric_difference(self.shown):
+            rect = pygame.Rect(j * size, i * size, size, size)
+            rects.append(rect)
+            if (i, j) in alive:
+                blits.append((self.alive_cell, rect))
+            else:
+                blits.append((self.background, rect, rect))
+        self.screen.blits(blits, doreturn=False)
+        self.shown = alive
+        return rects
 
     def run(self) -> None:
         """ Запустить игру """
         pygame.init()
         clock = pygame.time.Clock()
         pygame.display.set_caption("Game of Life")
-        self.screen.fill(pygame.Color("white"))
+        self.screen.blit(self.background, (0, 0))
+        self.shown = set()
+        pygame.display.flip()
 
         running = True
         paused = False
@@ -70,16 +87,18 @@ class GUI(UI):
                         paused = not paused
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     pos = pygame.mouse.get_pos()
-                    self.life.curr_generation[pos[1] // self.cell_size][
-                        pos[0] // self.cell_size
-                    ] ^= 1
-            # Отрисовка списка клеток
-            self.draw_grid()
-            self.draw_lines()
+                    grid = self.life.get_grid()
+                    grid[pos[1] // self.cell_size][pos[0] // self.cell_size] ^= 1
+                    self.life.set_grid(grid)
+            # Отрисовка только изменившихся клеток
+            rects = self.draw_grid()
+            if len(rects) > MAX_DIRTY_RECTS:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
             # Выполнение одного шага игры (обновление состояния ячеек), если нет паузы
             if not paused:
                 self.life.step()
-            pygame.display.flip()
             clock.tick(self.speed)
         pygame.quit()
 
@@ -110,6 +129,14 @@ if __name__ == "__main__":
         default=100,
         help="Number of max generations",
     )
+    parser.add_argument(
+        "--engine",
+        action="store",
+        dest="engine",
+        choices=list(ENGINES),
+        default="python",
+        help="Engine that computes generations",
+    )
     parser.add_argument(
         "--cell-size",
         action="store",
@@ -119,6 +146,6 @@ if __name__ == "__main__":
         help="Size of a cell",
     )
     args = parser.parse_args()
-    life = GameOfLife((args.height, args.width), max_generations=args.max_generations)
+    life = ENGINES[args.engine]((args.height, args.width), max_generations=args.max_generations)
     gui = GUI(life, cell_size=args.cell_size)
     gui.run()
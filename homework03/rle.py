@@ -0,0 +1,101 @@
+import pathlib
+import re
+import typing as tp
+
+Cell = tp.Tuple[int, int]
+
+# Длина строк при записи, как в большинстве программ для «Жизни»
+LINE_LENGTH = 70
+
+HEADER = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?", re.I)
+TOKEN = re.compile(r"(\d*)([^\d\s])")
+# Правило B3/S23 в обеих принятых записях
+RULES = {"b3/s23", "23/3"}
+
+
+def parse_rle(text: str) -> tp.Tuple[int, int, tp.List[Cell]]:
+    """
+    Разобрать узор в формате RLE: вернуть число строк, число столбцов и живые клетки.
+
+    Строки-комментарии начинаются с #, затем идет заголовок x = столбцы,
+    y = строки, а за ним клетки: b - мертвая, o (или любая другая буква) - живая,
+    $ - конец строки, ! - конец узора. Число перед символом повторяет его.
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line and not line.startswith("#")]
+    if not lines:
+        raise ValueError("RLE pattern has no header")
+    header = HEADER.match(lines[0])
+    if header is None:
+        raise ValueError(f"Invalid RLE header: {lines[0]!r}")
+    cols, rows = int(header.group(1)), int(header.group(2))
+    rule = header.group(3)
+    if rule is not None and rule.lower() not in RULES:
+        raise ValueError(f"Unsupported rule: {rule}")
+    cells: tp.List[Cell] = []
+    i = j = 0
+    for token in TOKEN.finditer("".join(lines[1:])):
+        count = int(token.group(1) or 1)
+        tag = token.group(2)
+        if tag == "!":
+            break
+        if tag == "$":
+            i, j = i + count, 0
+        elif tag in "b.":
+            j += count
+        else:
+            if i >= rows or j + count > cols:
+                raise ValueError(f"RLE pattern does not fit in {cols}x{rows}")
+            cells.extend((i, k) for k in range(j, j + count))
+            j += count
+    return rows, cols, cells
+
+
+def format_rle(rows: int, cols: int, cells: tp.Iterable[Cell]) -> str:
+    """
+    Записать живые клетки поля rows x cols в формате RLE.
+    """
+    tokens = []
+    i = j = 0
+    for x, y, count in _runs(sorted(cells)):
+        if x > i:
+            tokens.append(_token(x - i, "$"))
+            i, j = x, 0
+        if y > j:
+            tokens.append(_token(y - j, "b"))
+        tokens.append(_token(count, "o"))
+        j = y + count
+    tokens.append("!")
+    lines = [f"x = {cols}, y = {rows}, rule = B3/S23"]
+    line = ""
+    for token in tokens:
+        if len(line) + len(token) > LINE_LENGTH:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _runs(cells: tp.List[Cell]) -> tp.Iterator[tp.Tuple[int, int, int]]:
+    # Отрезки подряд идущих живых клеток строки: (строка, первый столбец, длина)
+    start = 0
+    for k in range(1, len(cells) + 1):
+        if k == len(cells) or cells[k] != (cells[k - 1][0], cells[k - 1][1] + 1):
+            x, y = cells[start]
+            yield x, y, k - start
+            start = k
+
+
+def _token(count: int, tag: str) -> str:
+    return f"{count}{tag}" if count > 1 else tag
+
+
+def read_rle(filename: pathlib.Path) -> tp.Tuple[int, int, tp.List[Cell]]:
+    with open(filename) as f:
+        return parse_rle(f.read())
+
+
+def write_rle(filename: pathlib.Path, rows: int, cols: int, cells: tp.Iterable[Cell]) -> None:
+    with open(filename, "w") as f:
+        f.write(format_rle(rows, cols, cells))
@@ -0,0 +1,95 @@
+import os
+import pathlib
+import struct
+import typing as tp
+import zlib
+
+import numpy as np
+
+Cell = tp.Tuple[int, int]
+
+# Файл начинается с MAGIC и размера поля, за ними идут записи: номер поколения,
+# длина сжатых данных и сами данные - номера клеток (i * cols + j), изменившихся
+# с предыдущей записи, в порядке возрастания. Хранятся разности соседних номеров,
+# они маленькие и хорошо сжимаются zlib.
+MAGIC = b"LIFEDIFF"
+HEADER = struct.Struct("<QQ")
+RECORD = struct.Struct("<QI")
+
+
+class SnapshotWriter:
+    """
+    Дописывает поколения игры в один файл в виде сжатых разностей.
+
+    Первая запись хранит все живые клетки, следующие - только изменившиеся, поэтому
+    долгий прогон занимает на диске пропорционально числу изменений. Если файл уже
+    есть, запись продолжается с его последнего поколения.
+    """
+
+    def __init__(self, filename: pathlib.Path, size: tp.Tuple[int, int], level: int = 6) -> None:
+        self.rows, self.cols = size
+        self.level = level
+        # Номера живых клеток последней записи
+        self._alive = np.empty(0, dtype=np.uint64)
+        if os.path.exists(filename) and os.path.getsize(filename):
+            with open(filename, "rb") as f:
+                rows, cols = _read_header(f)
+                if (rows, cols) != (self.rows, self.cols):
+                    raise ValueError(f"{filename} holds a {rows}x{cols} board")
+                for _, self._alive in _read_states(f):
+                    pass
+            self._file = open(filename, "ab")
+        else:
+            self._file = open(filename, "wb")
+            self._file.write(MAGIC + HEADER.pack(self.rows, self.cols))
+
+    def append(self, cells: tp.Iterable[Cell], generation: int) -> None:
+        """
+        Дописать поколение с живыми клетками cells.
+        """
+        alive = np.array(sorted(i * self.cols + j for i, j in cells), dtype=np.uint64)
+        changed = np.setxor1d(self._alive, alive, assume_unique=True)
+        gaps = np.diff(changed, prepend=np.uint64(0)).astype("<u8")
+        data = zlib.compress(gaps.tobytes(), self.level)
+        self._file.write(RECORD.pack(generation, len(data)) + data)
+        self._alive = alive
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, *args: tp.Any) -> None:
+        self.close()
+
+
+def _read_header(f: tp.BinaryIO) -> tp.Tuple[int, int]:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{f.name} is not a snapshot file")
+    rows, cols = HEADER.unpack(f.read(HEADER.size))
+    return rows, cols
+
+
+def _read_states(f: tp.BinaryIO) -> tp.Iterator[tp.Tuple[int, np.ndarray]]:
+    # Номера поколений и номера их живых клеток по порядку записей
+    alive = np.empty(0, dtype=np.uint64)
+    while True:
+        record = f.read(RECORD.size)
+        if len(record) < RECORD.size:
+            return
+        generation, length = RECORD.unpack(record)
+        gaps = np.frombuffer(zlib.decompress(f.read(length)), dtype="<u8")
+        alive = np.setxor1d(alive, np.cumsum(gaps, dtype=np.uint64), assume_unique=True)
+        yield generation, alive
+
+
+def read_snapshots(filename: pathlib.Path) -> tp.Iterator[tp.Tuple[int, tp.List[Cell]]]:
+    """
+    Поколения, записанные SnapshotWriter: номер поколения и его живые клетки.
+    """
+    with open(filename, "rb") as f:
+        _, cols = _read_header(f)
+        for generation, alive in _read_states(f):
+            rows, columns = np.divmod(alive, np.uint64(cols))
+            yield generation, list(zip(rows.tolist(), columns.tolist()))
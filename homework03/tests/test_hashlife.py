@@ -0,0 +1,71 @@
+import pathlib
+import random
+import tempfile
+import unittest
+
+import hashlife
+import life
+
+GLIDER = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+
+
+class TestHashLife(unittest.TestCase):
+    def test_glider_moves_diagonally(self):
+        game = hashlife.HashLife()
+        game.set_grid(GLIDER)
+        game.step_many(4 * 1000)
+        self.assertEqual(1 + 4 * 1000, game.generations)
+        self.assertEqual(5, game.population)
+        self.assertEqual(GLIDER, game.get_grid(3, 3, top=1000, left=1000))
+
+    def test_matches_sparse_engine(self):
+        random.seed(42)
+        soup = [(i, j) for i in range(100, 116) for j in range(100, 116) if random.random() < 0.4]
+        expected = life.SparseGameOfLife((220, 220), randomize=False)
+        expected.curr_generation = frozenset(soup)
+        game = hashlife.HashLife()
+        game.set_cells(soup)
+        for steps in [0, 1, 1, 2, 5, 8, 13, 21]:
+            with self.subTest(steps=steps):
+                for _ in range(steps):
+                    expected.step()
+                game.step_many(steps)
+                self.assertEqual(set(expected.curr_generation), set(game.cells()))
+
+    def test_small_cache_gives_same_result(self):
+        big = hashlife.HashLife()
+        small = hashlife.HashLife(cache_size=64)
+        for game in (big, small):
+            game.set_grid(GLIDER + [[0, 0, 0], [1, 1, 1]])
+            game.step_many(1000)
+        self.assertLessEqual(small.successor.cache_info().currsize, 64)
+        self.assertEqual(sorted(big.cells()), sorted(small.cells()))
+
+    def test_save_and_load(self):
+        game = life.GameOfLife((6, 8), randomize=False)
+        game.curr_generation = [
+            [1, 1, 0, 0, 1, 1, 1, 1],
+            [0, 1, 1, 1, 1, 1, 1, 0],
+            [1, 0, 1, 1, 0, 0, 0, 0],
+            [1, 0, 0, 0, 0, 0, 0, 1],
+            [1, 0, 1, 1, 1, 1, 0, 0],
+            [1, 1, 1, 1, 0, 1, 1, 1],
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "grid.txt"
+            game.save(path)
+            loaded = hashlife.HashLife.from_file(path)
+            self.assertEqual(game.curr_generation, loaded.get_grid(6, 8))
+            loaded.step()
+            loaded.save(path, 6, 8)
+            self.assertEqual(loaded.get_grid(6, 8), life.GameOfLife.from_file(path).curr_generation)
+
+    def test_save_and_load_rle(self):
+        game = hashlife.HashLife()
+        game.set_grid(GLIDER)
+        game.step_many(100)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "glider.rle"
+            game.save(path, 3, 3, top=25, left=25)
+            loaded = hashlife.HashLife.from_file(path)
+        self.assertEqual(GLIDER, loaded.get_grid(3, 3))
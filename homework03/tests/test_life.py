@@ -1,6 +1,8 @@
 import json
 import os
+import pathlib
 import random
+import tempfile
 import unittest
 
 import life
@@ -138,3 +140,245 @@ class TestGameOfLife(unittest.TestCase):
         for _ in range(self.max_generations + 1):
             game.step()
         self.assertFalse(game.is_changing)
+
+
+class EngineTests:
+    """Проверки, общие для всех движков: класс движка задается в атрибуте engine"""
+
+    engine = life.GameOfLife
+
+    def setUp(self):
+        self.grid = [
+            [1, 1, 0, 0, 1, 1, 1, 1],
+            [0, 1, 1, 1, 1, 1, 1, 0],
+            [1, 0, 1, 1, 0, 0, 0, 0],
+            [1, 0, 0, 0, 0, 0, 0, 1],
+            [1, 0, 1, 1, 1, 1, 0, 0],
+            [1, 1, 1, 1, 0, 1, 1, 1],
+        ]
+        tests_dir = os.path.dirname(__file__)
+        with open(os.path.join(tests_dir, "steps.txt")) as f:
+            self.steps = json.load(f)
+
+    def make_game(self, grid):
+        game = self.engine((len(grid), len(grid[0])), randomize=False)
+        game.set_grid(grid)
+        return game
+
+    def load(self, path):
+        return self.engine.from_file(path)
+
+    def test_can_update(self):
+        game = self.make_game(self.grid)
+        num_updates = 0
+        for step in sorted(self.steps.keys(), key=int):
+            with self.subTest(step=step):
+                for _ in range(int(step) - num_updates):
+                    game.step()
+                    num_updates += 1
+                self.assertEqual(self.steps[step], game.get_grid())
+
+    def test_matches_python_engine(self):
+        random.seed(2021)
+        expected = life.GameOfLife((30, 40))
+        game = self.make_game(expected.curr_generation)
+        game.history_size = expected.history_size
+        for _ in range(25):
+            expected.step()
+            game.step()
+            self.assertEqual(expected.curr_generation, game.get_grid())
+            self.assertEqual(expected.is_changing, game.is_changing)
+            self.assertEqual(expected.hash, game.hash)
+
+    def test_is_not_changing(self):
+        game = self.make_game(self.grid)
+        for _ in range(19):
+            game.step()
+        self.assertFalse(game.is_changing)
+
+    def test_detects_cycles(self):
+        # Мигалка и блок: период 2
+        game = self.make_game(
+            [
+                [0, 0, 0, 0, 0, 0, 0],
+                [0, 1, 0, 0, 0, 1, 1],
+                [0, 1, 0, 0, 0, 1, 1],
+                [0, 1, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0, 0],
+            ]
+        )
+        game.history_size = 16
+        game.step()
+        self.assertTrue(game.is_changing)
+        game.step()
+        self.assertFalse(game.is_changing)
+        self.assertEqual(2, game.period)
+
+    def test_detects_still_life(self):
+        game = self.make_game([[0, 0, 0, 0], [0, 1, 1, 0], [0, 1, 1, 0]])
+        game.history_size = 16
+        game.step()
+        self.assertFalse(game.is_changing)
+        self.assertEqual(1, game.period)
+
+    def test_set_grid_resets_history(self):
+        game = self.make_game([[0, 1, 0], [0, 1, 0], [0, 1, 0]])
+        game.history_size = 16
+        game.step()
+        game.step()
+        self.assertFalse(game.is_changing)
+        game.set_grid([[0, 1, 1], [0, 1, 0], [0, 0, 0]])
+        game.step()
+        self.assertTrue(game.is_changing)
+
+    def test_history_is_bounded(self):
+        random.seed(7)
+        game = self.make_game(life.GameOfLife((30, 30)).curr_generation)
+        game.history_size = 4
+        for _ in range(10):
+            game.step()
+        self.assertLessEqual(len(game.history), 4)
+
+    def test_constructor_arguments_match_base(self):
+        game = self.engine((4, 5), False, 10, 16)
+        if hasattr(game, "close"):
+            self.addCleanup(game.close)
+        self.assertEqual(
+            (4, 5, 10, 16), (game.rows, game.cols, game.max_generations, game.history_size)
+        )
+
+    def test_cycle_detection_can_be_disabled(self):
+        game = self.make_game([[0, 1, 0], [0, 1, 0], [0, 1, 0]])
+        game.history_size = 0
+        game.step()
+        game.step()
+        self.assertTrue(game.is_changing)
+        self.assertEqual({}, game.history)
+        # Включенный позже поиск циклов считает хеш заново
+        game.history_size = 16
+        game.step()
+        game.step()
+        self.assertFalse(game.is_changing)
+        self.assertEqual(2, game.period)
+
+    def test_save_and_load(self):
+        game = self.make_game(self.grid)
+        game.step()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "grid.txt"
+            game.save(path)
+            loaded = self.load(path)
+        self.assertIsInstance(loaded, self.engine)
+        self.assertEqual(game.get_grid(), loaded.get_grid())
+
+    def test_from_file_skips_blank_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "glider.txt"
+            path.write_text("010\n001\n111\n\n")
+            game = self.load(path)
+        self.assertEqual([[0, 1, 0], [0, 0, 1], [1, 1, 1]], game.get_grid())
+
+    def test_save_and_load_rle(self):
+        game = self.make_game(self.grid)
+        game.step()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "grid.rle"
+            game.save(path)
+            loaded = self.load(path)
+        self.assertIsInstance(loaded, self.engine)
+        self.assertEqual(game.get_grid(), loaded.get_grid())
+
+    def test_cells(self):
+        game = self.make_game(self.grid)
+        cells = [(i, j) for i, row in enumerate(self.grid) for j, value in enumerate(row) if value]
+        self.assertEqual(cells, sorted(game.get_cells()))
+        game.set_cells([(0, 1), (5, 7)])
+        self.assertEqual([(0, 1), (5, 7)], sorted(game.get_cells()))
+        self.assertEqual(2, sum(map(sum, game.get_grid())))
+
+
+class TestPythonGameOfLife(EngineTests, unittest.TestCase):
+    engine = life.GameOfLife
+
+
+class TestNumpyGameOfLife(EngineTests, unittest.TestCase):
+    engine = life.NumpyGameOfLife
+
+    def test_cycles_are_not_tracked_by_default(self):
+        game = self.make_game(self.grid)
+        game.step()
+        self.assertEqual(0, game.hash)
+        self.assertEqual(16, self.engine((6, 8), history_size=16).history_size)
+
+
+class TestBitGameOfLife(EngineTests, unittest.TestCase):
+    engine = life.BitGameOfLife
+
+    def test_get_neighbours(self):
+        game = self.make_game(self.grid)
+        expected = life.GameOfLife((6, 8))
+        expected.curr_generation = self.grid
+        for cell in [(0, 0), (0, 7), (5, 0), (5, 7), (2, 3), (0, 3), (2, 0)]:
+            with self.subTest(cell=cell):
+                self.assertEqual(
+                    sorted(expected.get_neighbours(cell)), sorted(game.get_neighbours(cell))
+                )
+
+    def test_rows_are_packed(self):
+        game = self.make_game([[1, 0, 1], [0, 1, 1]])
+        self.assertEqual([0b101, 0b110], game.curr_generation)
+
+
+class TestSparseGameOfLife(EngineTests, unittest.TestCase):
+    engine = life.SparseGameOfLife
+
+    def test_only_changes_are_evaluated(self):
+        game = self.engine((1000, 1000), randomize=False)
+        # Мигалка в углу огромного поля
+        game.set_grid([[0, 1, 0], [0, 1, 0], [0, 1, 0]])
+        game.step()
+        self.assertEqual({(1, 0), (1, 1), (1, 2)}, set(game.curr_generation))
+        self.assertEqual({(0, 1), (2, 1), (1, 0), (1, 2)}, set(game._changed))
+        self.assertTrue(game.is_changing)
+        game.step()
+        self.assertEqual({(0, 1), (1, 1), (2, 1)}, set(game.curr_generation))
+
+
+class TestParallelGameOfLife(EngineTests, unittest.TestCase):
+    engine = life.ParallelGameOfLife
+
+    def make_game(self, grid):
+        game = self.engine((len(grid), len(grid[0])), randomize=False, workers=3)
+        self.addCleanup(game.close)
+        game.set_grid(grid)
+        return game
+
+    def load(self, path):
+        game = self.engine.from_file(path)
+        self.addCleanup(game.close)
+        return game
+
+    def test_can_read_after_close(self):
+        with life.ParallelGameOfLife((20, 30), workers=2) as game:
+            game.step()
+            expected = game.get_grid()
+        self.assertEqual(expected, game.get_grid())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "grid.txt"
+            game.save(path)
+            self.assertEqual(expected, life.GameOfLife.from_file(path).get_grid())
+        game.close()
+        with self.assertRaises(ValueError):
+            game.step()
+
+    def test_generations_are_double_buffered(self):
+        with life.ParallelGameOfLife((20, 30), workers=4) as game:
+            buffers = {id(game.prev_generation), id(game.curr_generation)}
+            expected = life.NumpyGameOfLife((20, 30), randomize=False)
+            expected.curr_generation = game.curr_generation.copy()
+            for _ in range(5):
+                game.step()
+                expected.step()
+                self.assertEqual(buffers, {id(game.prev_generation), id(game.curr_generation)})
+                self.assertEqual(expected.get_grid(), game.get_grid())
+                self.assertEqual(expected.prev_generation.tolist(), game.prev_generation.tolist())
@@ -0,0 +1,41 @@
+import unittest
+
+import rle
+
+GLIDER = """#N Glider
+#O Richard K. Guy
+x = 3, y = 3, rule = B3/S23
+bob$2bo$3o!
+"""
+
+
+class TestRle(unittest.TestCase):
+    def test_parse(self):
+        rows, cols, cells = rle.parse_rle(GLIDER)
+        self.assertEqual((3, 3), (rows, cols))
+        self.assertEqual([(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)], cells)
+
+    def test_parse_multiline_and_empty_rows(self):
+        text = "x = 4, y = 5\n2o\n2b$\n3$3bo!"
+        self.assertEqual((5, 4, [(0, 0), (0, 1), (4, 3)]), rle.parse_rle(text))
+
+    def test_format(self):
+        cells = [(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)]
+        self.assertEqual("x = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n", rle.format_rle(3, 3, cells))
+
+    def test_long_lines_are_wrapped(self):
+        cells = [(i, j) for i in range(40) for j in range(0, 80, 2)]
+        text = rle.format_rle(40, 80, cells)
+        self.assertTrue(all(len(line) <= rle.LINE_LENGTH for line in text.splitlines()))
+        self.assertEqual((40, 80, cells), rle.parse_rle(text))
+
+    def test_roundtrip(self):
+        cells = [(0, 0), (0, 1), (0, 2), (3, 5), (7, 0), (7, 9)]
+        self.assertEqual((8, 10, cells), rle.parse_rle(rle.format_rle(8, 10, cells)))
+        self.assertEqual((8, 10, []), rle.parse_rle(rle.format_rle(8, 10, [])))
+
+    def test_invalid_patterns(self):
+        for text in ["", "bo$2bo!", "x = 3, y = 3, rule = B36/S23\no!", "x = 2, y = 1\n3o!"]:
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    rle.parse_rle(text)
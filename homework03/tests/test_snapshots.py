@@ -0,0 +1,48 @@
+import pathlib
+import random
+import tempfile
+import unittest
+
+import life
+import snapshots
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = pathlib.Path(tmp.name) / "run.life"
+
+    def record(self, game, steps):
+        expected = []
+        with snapshots.SnapshotWriter(self.path, (game.rows, game.cols)) as writer:
+            for _ in range(steps):
+                writer.append(game.get_cells(), game.generations)
+                expected.append((game.generations, sorted(game.get_cells())))
+                game.step()
+        return expected
+
+    def test_write_and_read(self):
+        random.seed(3)
+        game = life.SparseGameOfLife((40, 50))
+        expected = self.record(game, 20)
+        self.assertEqual(expected, list(snapshots.read_snapshots(self.path)))
+
+    def test_append_to_existing_file(self):
+        random.seed(4)
+        game = life.SparseGameOfLife((30, 30))
+        expected = self.record(game, 5)
+        expected += self.record(game, 5)
+        self.assertEqual(expected, list(snapshots.read_snapshots(self.path)))
+
+    def test_only_changes_are_stored(self):
+        game = life.SparseGameOfLife((10000, 10000), randomize=False)
+        game.set_cells([(5000, 5000), (5000, 5001), (5000, 5002)])
+        self.record(game, 1000)
+        # Мигалка меняет четыре клетки за поколение
+        self.assertLess(self.path.stat().st_size, 1000 * 64)
+
+    def test_size_mismatch(self):
+        self.record(life.SparseGameOfLife((10, 10)), 1)
+        with self.assertRaises(ValueError):
+            snapshots.SnapshotWriter(self.path, (10, 20))